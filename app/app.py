@@ -4,24 +4,15 @@ import os
 import time
 from pathlib import Path
 from PIL import Image
-import pandas as pd
 
 # Path setup
 project_root = Path(__file__).resolve().parent.parent if "__file__" in globals() else Path().resolve().parent
 src_path = project_root / "src"
 sys.path.append(str(src_path))
 
-# Local modules
-from transcript_utils import clean_transcript_text
-from chef_rag import ChefInferno
-from chef_service import generate_chef_response
-from config import (
-    YOUTUBE_VIDEO_ID,
-    DEFAULT_MODEL,
-    RAW_TRANSCRIPTS_DIR,
-    PREPROCESSED_TRANSCRIPTS_DIR,
-    PERSONAS_DIR,
-)
+# Local modules (light only: the pipeline is imported by the warm-up thread)
+from warmup import WarmUp, WARMUP_STEPS
+from config import YOUTUBE_VIDEO_ID, DEFAULT_MODEL
 
 # Page configuration
 st.set_page_config(
@@ -101,39 +92,65 @@ def load_chef_image():
         st.error(f"Could not load Chef's image: {e}")
         return 
 
+@st.cache_resource(show_spinner=False)
+def start_warmup(video_id, model):
+    """Start warming up the recommender, OpenAI client and persona once per process"""
+    return WarmUp([video_id], model).start()
+
+def render_warmup_status(warmup):
+    """Sidebar status of the background warm-up"""
+    if warmup.ready:
+        st.success(f"🔥 Kitchen ready ({warmup.report()['warmup_seconds']}s)")
+    else:
+        st.info("⏳ Kitchen warming up...")
+    
+    icons = {"ready": "✅", "loading": "⏳", "pending": "▫️"}
+    for name, label in WARMUP_STEPS.items():
+        status = warmup.status[name]
+        st.caption(f"{icons.get(status, '⚠️')} {label}: {status}")
+
+def show_warmup_status(warmup):
+    """Render the warm-up status, polling every second until the warm-up finishes"""
+    with st.sidebar:
+        st.fragment(render_warmup_status, run_every=None if warmup.finished else 1.0)(warmup)
+
 def reset_conversation():
     """Reset the conversation state"""
     st.session_state.conversation_started = False
     st.session_state.chef_response = ""
     st.session_state.user_ingredients = ""
-    st.session_state.typing_complete = False
-    st.session_state.typing_progress = 0
+    st.session_state.recipe_error = False
 
-def simulate_typing(text, speed=50):
-    """Simulate typing effect by displaying text character by character"""
-    placeholder = st.empty()
-    typed_text = ""
+def show_recipe_error():
+    """Store the fallback message shown when no recipe could be produced"""
+    st.session_state.chef_response = "Sorry, I don't have anything in mind for those ingredients. Try with something else!"
+    st.session_state.conversation_started = True
+    st.session_state.recipe_error = True
+
+def render_stream(chunks, placeholder, min_interval=0.05):
+    """
+    Render streamed text chunks as they arrive, redrawing at most every min_interval seconds.
+    Returns (text, error): a "❌ ..." chunk is a failure, so it clears the placeholder and
+    is returned as the error instead of being rendered.
+    """
+    parts = []
+    last_render = 0.0
     
-    for i, char in enumerate(text):
-        typed_text += char
-        # Add a blinking cursor at the end
-        display_text = typed_text + '<span class="typing-cursor"></span>'
-        placeholder.markdown(f'<div class="chef-response">{display_text}</div>', unsafe_allow_html=True)
-        
-        # Update session state with progress
-        st.session_state.typing_progress = i + 1
-        
-        # Adjust speed for punctuation - reduced delays for faster typing
-        if char in ".!?":
-            time.sleep(0.1) 
-        elif char == ",":
-            time.sleep(0.05) 
-        else:
-            time.sleep(1/speed)
+    for chunk in chunks:
+        if chunk.startswith("❌"):
+            placeholder.empty()
+            return "".join(parts), chunk
+        parts.append(chunk)
+        now = time.monotonic()
+        if now - last_render >= min_interval:
+            # Add a blinking cursor at the end while tokens are still arriving
+            placeholder.markdown(f'<div class="chef-response">{"".join(parts)}<span class="typing-cursor"></span></div>', unsafe_allow_html=True)
+            last_render = now
     
     # Remove cursor and show final text
-    placeholder.markdown(f'<div class="chef-response">{typed_text}</div>', unsafe_allow_html=True)
-    st.session_state.typing_complete = True
+    text = "".join(parts)
+    placeholder.markdown(f'<div class="chef-response">{text}</div>', unsafe_allow_html=True)
+    return text, None
 
 # Main app
 def main():
@@ -145,6 +162,10 @@ def main():
     model = DEFAULT_MODEL
     video_id = YOUTUBE_VIDEO_ID
     
+    # Shared state loads in the background; the page renders right away
+    warmup = start_warmup(video_id, model)
+    show_warmup_status(warmup)
+    
     # Initialize session state
     if "conversation_started" not in st.session_state:
         st.session_state.conversation_started = False
@@ -152,10 +173,6 @@ def main():
         st.session_state.chef_response = ""
     if "user_ingredients" not in st.session_state:
         st.session_state.user_ingredients = ""
-    if "typing_complete" not in st.session_state:
-        st.session_state.typing_complete = False
-    if "typing_progress" not in st.session_state:
-        st.session_state.typing_progress = 0
     if "recipe_error" not in st.session_state:
         st.session_state.recipe_error = False
     
@@ -190,6 +207,9 @@ def main():
                 key="ingredients_input"
             )
             
+            # Streamed critique is rendered here, above the buttons
+            response_area = st.empty()
+            
             # Generate response button
             col1, col2 = st.columns([2, 1])
             with col1:
@@ -202,83 +222,53 @@ def main():
                     st.session_state.user_ingredients = user_ingredients
                     user_query = user_ingredients
                     
-                    with st.spinner("Chef is thinking..."):
-                        try:
-                            result = generate_chef_response(
+                    try:
+                        if not warmup.ready:
+                            with st.spinner("Chef is still warming up the kitchen..."):
+                                warmup.wait()
+                        
+                        from chef_service import generate_chef_response_stream
+                        with st.spinner("Chef is thinking..."):
+                            result = generate_chef_response_stream(
                                 video_id=video_id, 
                                 user_query=user_query, 
                                 model=model
                             )
+                        
+                        # Check for errors in the response
+                        if "error" in result:
+                            show_recipe_error()
+                            st.rerun()
+                            return
+                        
+                        # Render the critique as the tokens arrive; failures come as a "❌ ..." chunk
+                        chef_response, critique_error = render_stream(result["critique_stream"], response_area)
+                        if critique_error or not chef_response:
+                            st.error(critique_error or "❌ The chef had nothing to say, please try again")
+                            return
+                        
+                        st.session_state.chef_response = chef_response
+                        st.session_state.conversation_started = True
+                        st.session_state.recipe_error = False
+                        st.rerun()
                             
-                            # Check for errors in the response
-                            if "error" in result:
-                                st.session_state.chef_response = "Sorry, I don't have anything in mind for those ingredients. Try with something else!"
-                                st.session_state.conversation_started = True
-                                st.session_state.recipe_error = True
-                                st.rerun()
-                                return
-                            
-                            # Extract the critique from the response
-                            chef_response = result.get("critique", "")
-                            
-                            if not chef_response:
-                                st.session_state.chef_response = "Sorry, I don't have anything in mind for those ingredients. Try with something else!"
-                                st.session_state.conversation_started = True
-                                st.session_state.recipe_error = True
-                                st.rerun()
-                                return
-                            
-                            # Check if the chef couldn't find a recipe
-                            if any(phrase in chef_response.lower() for phrase in ["sorry", "don't know", "can't", "no recipe", "not found"]):
-                                st.session_state.chef_response = "Sorry, I don't have anything in mind for those ingredients. Try with something else!"
-                                st.session_state.conversation_started = True
-                                st.session_state.recipe_error = True
-                                st.rerun()
-                            else:
-                                st.session_state.chef_response = chef_response
-                                st.session_state.conversation_started = True
-                                st.session_state.typing_complete = False
-                                st.session_state.recipe_error = False
-                                st.rerun()
-                                
-                        except Exception as e:
-                            # Handle the specific error you mentioned
-                            error_msg = str(e)
-                            if "Index(['Name'], dtype='object')" in error_msg:
-                                st.session_state.chef_response = "Sorry, I don't have anything in mind for those ingredients. Try with something else!"
-                                st.session_state.conversation_started = True
-                                st.session_state.recipe_error = True
-                                st.rerun()
-                            else:
-                                st.error(f"⚠️ Something went wrong while generating the recipe: {error_msg}")
+                    except Exception as e:
+                        # Handle the specific error you mentioned
+                        error_msg = str(e)
+                        if "Index(['Name'], dtype='object')" in error_msg:
+                            show_recipe_error()
+                            st.rerun()
+                        else:
+                            st.error(f"⚠️ Something went wrong while generating the recipe: {error_msg}")
 
         else:
-            # Show Chef's response with typing effect
+            # Show Chef's response (already streamed in on the previous run)
             if st.session_state.chef_response:
-                # If it's an error message, show it immediately without typing effect
-                if st.session_state.recipe_error:
-                    st.markdown(f"""
-                    <div class="chef-response">
-                        {st.session_state.chef_response}
-                    </div>
-                    """, unsafe_allow_html=True)
-                # Otherwise, use typing effect for recipe
-                else:
-                    # If typing is not complete, simulate typing
-                    if not st.session_state.typing_complete:
-                        # Start from where we left off if any
-                        text_to_type = st.session_state.chef_response
-                        if st.session_state.typing_progress > 0:
-                            text_to_type = text_to_type[st.session_state.typing_progress:]
-                        
-                        simulate_typing(text_to_type)
-                    else:
-                        # Show full response if typing is complete
-                        st.markdown(f"""
-                        <div class="chef-response">
-                            {st.session_state.chef_response}
-                        </div>
-                        """, unsafe_allow_html=True)
+                st.markdown(f"""
+                <div class="chef-response">
+                    {st.session_state.chef_response}
+                </div>
+                """, unsafe_allow_html=True)
             
             # Button to cook another recipe
             if st.button("🍳 Cook Another Recipe", type="primary", use_container_width=True, 
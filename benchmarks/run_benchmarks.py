@@ -0,0 +1,220 @@
+"""
+Offline performance benchmarks for the Chef Inferno pipeline.
+
+Generates synthetic recipe artifacts and transcripts, starts the local
+OpenAI stub, and measures each scenario at increasing concurrency,
+reporting p50/p95/p99 latency, throughput and peak RSS. Nothing touches
+the network, the real ML Food Buddy project or the repo's data/ folder.
+
+    python benchmarks/run_benchmarks.py --rows 100000 --concurrency 1,4,16
+    python benchmarks/run_benchmarks.py --scenarios recommend --rows 500000 --json bench.json
+"""
+import argparse
+import json
+import math
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path.append(str(PROJECT_ROOT / "src"))
+sys.path.append(str(BENCH_DIR))
+
+from synthetic_data import INGREDIENTS, generate_recipes, generate_transcripts, fake_transcript
+
+SCENARIOS = ["recommend", "clean_transcript", "critique", "pipeline_warm", "pipeline_cold"]
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    # Nearest-rank percentile
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(name, fn, inputs, concurrency):
+    """Run fn over inputs with `concurrency` threads and summarize latencies."""
+    def timed(item):
+        start = time.perf_counter()
+        fn(item)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, inputs))
+    wall = time.perf_counter() - start
+
+    return {
+        "scenario": name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "throughput_rps": len(latencies) / wall if wall else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def random_query(rng):
+    return ", ".join(rng.sample(INGREDIENTS, rng.randint(2, 5)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_stub(port, ttft, token_delay, completion_tokens):
+    process = subprocess.Popen([
+        sys.executable, str(BENCH_DIR / "stub_openai.py"),
+        "--port", str(port), "--ttft", str(ttft),
+        "--token-delay", str(token_delay), "--completion-tokens", str(completion_tokens),
+    ], stdout=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("Stub OpenAI server did not start")
+
+
+def prepare_environment(args, work_dir):
+    """Create synthetic inputs and point the pipeline at them (before importing src)."""
+    recipes_dir = work_dir / f"food-buddy-{args.rows}"
+    if not (recipes_dir / "models" / "recipe_vectors.npy").exists():
+        print(f"Generating {args.rows} synthetic recipes in {recipes_dir} ...", flush=True)
+        generate_recipes(recipes_dir, rows=args.rows)
+
+    data_dir = Path(tempfile.mkdtemp(prefix="data-", dir=work_dir))
+    for sub in ["raw/transcripts", "preprocessed/transcripts", "preprocessed/personas"]:
+        (data_dir / sub).mkdir(parents=True, exist_ok=True)
+
+    fixtures_dir = data_dir / "fixtures"
+    n_levels = len(args.concurrency)
+    cold_ids = generate_transcripts(fixtures_dir, count=args.requests * n_levels, words=args.transcript_words, prefix="cold")
+    warm_ids = generate_transcripts(fixtures_dir, count=1, words=args.transcript_words, prefix="warm")
+
+    os.environ.update({
+        "OPENAI_API_KEY": "stub",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{args.port}/v1",
+        "OPENAI_RPM_LIMIT": str(10 ** 6),
+        "OPENAI_TPM_LIMIT": str(10 ** 9),
+        "ML_BUDDY_PATH": str(recipes_dir),
+        "CHEF_DATA_DIR": str(data_dir),
+        "TRANSCRIPT_FIXTURES_DIR": str(fixtures_dir),
+    })
+
+    # After the environment is set: conversion imports src modules
+    if args.recipe_store and not (recipes_dir / "models" / "recipe_store" / "meta.json").exists():
+        from recipe_store import convert
+        convert(recipes_dir / "data" / "preprocessed" / "final_recipes.csv.gzip", recipes_dir / "models" / "recipe_store")
+    elif not args.recipe_store:
+        # The recommender picks up a store automatically; hide it for DataFrame runs
+        (recipes_dir / "models" / "recipe_store" / "meta.json").unlink(missing_ok=True)
+    return cold_ids, warm_ids[0]
+
+
+def run(args):
+    work_dir = Path(args.work_dir or tempfile.mkdtemp(prefix="chef-bench-"))
+    work_dir.mkdir(parents=True, exist_ok=True)
+    args.port = args.port or free_port()
+    cold_ids, warm_id = prepare_environment(args, work_dir)
+    stub = start_stub(args.port, args.ttft, args.token_delay, args.completion_tokens)
+
+    try:
+        from food_buddy_api import get_recommender, get_food_buddy_recommendations
+        from transcript_utils import clean_transcript_text
+        from chef_rag import ChefInferno
+        from chef_service import generate_chef_response
+
+        rng = random.Random(0)
+        results = []
+
+        start = time.perf_counter()
+        get_recommender().load()
+        print(f"Recommender load: {time.perf_counter() - start:.2f}s, peak RSS {peak_rss_mb():.0f} MB", flush=True)
+
+        recipe = get_food_buddy_recommendations(random_query(rng))[0]
+        chef = ChefInferno()
+        chef.chef_persona = "A fiery, impatient chef who insults bad cooking but teaches well."
+        generate_chef_response(warm_id, random_query(rng))  # Build the warm persona
+        cold_iter = iter(cold_ids)
+
+        scenarios = {
+            "recommend": lambda i: get_food_buddy_recommendations(random_query(random.Random(i))),
+            "clean_transcript": lambda i: clean_transcript_text(
+                fake_transcript(args.transcript_words, seed=10 ** 6 + i), f"bench{i}", save_raw=False),
+            "critique": lambda i: chef.critique_recipe(recipe, random_query(random.Random(i))),
+            "pipeline_warm": lambda i: generate_chef_response(warm_id, random_query(random.Random(i))),
+            "pipeline_cold": lambda video_id: generate_chef_response(video_id, random_query(random.Random(video_id))),
+        }
+
+        request_id = 0
+        for name in args.scenarios:
+            for concurrency in args.concurrency:
+                if name == "pipeline_cold":
+                    inputs = [next(cold_iter) for _ in range(args.requests)]
+                else:
+                    inputs = list(range(request_id, request_id + args.requests))
+                    request_id += args.requests
+                result = measure(name, scenarios[name], inputs, concurrency)
+                results.append(result)
+                print(
+                    f"{name:<17} c={concurrency:<3} p50={result['p50_ms']:8.1f}ms p95={result['p95_ms']:8.1f}ms "
+                    f"p99={result['p99_ms']:8.1f}ms {result['throughput_rps']:8.1f} req/s rss={result['peak_rss_mb']:.0f}MB",
+                    flush=True,
+                )
+        return results
+    finally:
+        stub.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Chef Inferno benchmarks")
+    parser.add_argument("--rows", type=int, default=10000, help="Synthetic recipes (e.g. 10000, 100000, 500000)")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=32, help="Requests per scenario and concurrency level")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset of " + ", ".join(SCENARIOS))
+    parser.add_argument("--transcript-words", type=int, default=3000)
+    parser.add_argument("--ttft", type=float, default=0.3, help="Stub seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="Stub seconds per token")
+    parser.add_argument("--completion-tokens", type=int, default=200)
+    parser.add_argument("--recipe-store", action="store_true", help="Serve recipe metadata from a RecipeStore")
+    parser.add_argument("--port", type=int, default=0, help="Stub port (default: a free one)")
+    parser.add_argument("--work-dir", help="Where synthetic artifacts are kept (reused across runs)")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    args.concurrency = [int(c) for c in args.concurrency.split(",")]
+    args.scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = run(args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Local OpenAI-compatible stand-in for benchmarks.
+
+Serves POST /v1/chat/completions (plain and streaming) with configurable
+time-to-first-token and per-token latency, so the pipeline can be measured
+without an API key or network access.
+
+    python benchmarks/stub_openai.py --port 8787 --ttft 0.3 --token-delay 0.01
+    OPENAI_BASE_URL=http://127.0.0.1:8787/v1 OPENAI_API_KEY=stub ...
+"""
+import argparse
+import json
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+FILLER = (
+    "Right you donkey listen carefully because this dish needs proper seasoning "
+    "a hot pan and a bit of respect for the ingredients now taste it"
+).split()
+
+
+def make_handler(ttft: float, token_delay: float, completion_tokens: int):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status: int, payload: dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._send_json(200, {"status": "ok"})
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not self.path.endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                return
+
+            n_tokens = min(completion_tokens, request.get("max_tokens") or completion_tokens)
+            words = [FILLER[i % len(FILLER)] for i in range(n_tokens)]
+            prompt_tokens = sum(len(m.get("content") or "") for m in request.get("messages", [])) // 4
+            model = request.get("model", "stub")
+
+            time.sleep(ttft)
+            if request.get("stream"):
+                self._stream(model, words)
+                return
+
+            time.sleep(token_delay * n_tokens)
+            self._send_json(200, {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": " ".join(words)}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": n_tokens, "total_tokens": prompt_tokens + n_tokens},
+            })
+
+        def _stream(self, model: str, words: list):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            def send(data: str):
+                payload = f"data: {data}\n\n".encode("utf-8")
+                self.wfile.write(f"{len(payload):x}\r\n".encode("ascii") + payload + b"\r\n")
+                self.wfile.flush()
+
+            for i, word in enumerate(words):
+                chunk = {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}, "finish_reason": None}],
+                }
+                send(json.dumps(chunk))
+                time.sleep(token_delay)
+            send("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+
+    return StubHandler
+
+
+def serve(port: int = 8787, ttft: float = 0.3, token_delay: float = 0.01, completion_tokens: int = 200):
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(ttft, token_delay, completion_tokens))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stub server")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--ttft", type=float, default=0.3, help="Seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="Seconds per generated token")
+    parser.add_argument("--completion-tokens", type=int, default=200, help="Tokens per completion (capped by max_tokens)")
+    args = parser.parse_args()
+
+    server = serve(args.port, args.ttft, args.token_delay, args.completion_tokens)
+    print(f"Stub OpenAI server on http://127.0.0.1:{args.port}/v1", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Synthetic artifacts for offline benchmarks.
+
+Writes an ML Food Buddy-shaped directory (TF-IDF vectorizer, dense recipe
+vectors and the preprocessed recipe table with the columns food_buddy_api
+expects) and fake `{video_id}.txt` transcripts.
+
+    python benchmarks/synthetic_data.py recipes /tmp/food-buddy-100k --rows 100000
+    python benchmarks/synthetic_data.py transcripts /tmp/transcripts --count 20
+"""
+import argparse
+import random
+from pathlib import Path
+import numpy as np
+
+INGREDIENTS = (
+    "chicken beef pork salmon shrimp tofu egg rice pasta noodle potato tomato onion garlic "
+    "ginger carrot celery pepper chili spinach kale broccoli mushroom zucchini eggplant corn "
+    "bean lentil chickpea basil parsley cilantro thyme rosemary oregano cumin paprika "
+    "cinnamon butter cream milk cheese parmesan mozzarella yogurt flour sugar honey lemon "
+    "lime vinegar soy mustard olive oil bacon sausage avocado coconut almond walnut"
+).split()
+STEPS = (
+    "Preheat the oven. Chop the vegetables finely. Heat oil in a large pan. Season generously "
+    "with salt and pepper. Simmer gently for twenty minutes. Stir in the cream. Bake until "
+    "golden. Rest before serving. Garnish with fresh herbs. Whisk until smooth."
+).split(". ")
+TRANSCRIPT_WORDS = (
+    "right come on what is this it is raw you donkey taste that the seasoning is gone "
+    "look at me focus beautiful lovely now that is how you cook a risotto get it out "
+    "yes chef move faster the pan is not hot enough this is a disaster well done"
+).split()
+
+# Stand-ins for the ML buddy modules; only their presence is checked
+MODULE_FILES = ("recommender.py", "utils.py", "config.py")
+
+
+def generate_recipes(out_dir, rows: int = 10000, max_features: int = 256, seed: int = 0, block_size: int = 50000):
+    """Write models/ and data/preprocessed/ for `rows` synthetic recipes."""
+    import joblib
+    import pandas as pd
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    out_dir = Path(out_dir)
+    rng = np.random.default_rng(seed)
+    (out_dir / "src").mkdir(parents=True, exist_ok=True)
+    (out_dir / "models").mkdir(parents=True, exist_ok=True)
+    (out_dir / "data" / "preprocessed").mkdir(parents=True, exist_ok=True)
+    for name in MODULE_FILES:
+        (out_dir / "src" / name).touch()
+
+    vocab = np.array(INGREDIENTS)
+    ingredient_lists = [" ".join(vocab[rng.choice(len(vocab), size=rng.integers(4, 12), replace=False)]) for _ in range(rows)]
+    steps = np.array(STEPS)
+    instructions = [". ".join(steps[rng.choice(len(steps), size=rng.integers(3, 8))]) + "." for _ in range(rows)]
+    total_time = rng.integers(5, 240, size=rows)
+
+    df = pd.DataFrame({
+        # Roughly 10% duplicate names, as in the real dataset
+        "Name": [f"Recipe {i}" for i in rng.integers(0, int(rows * 0.9) or 1, size=rows)],
+        "Image_first": [f"https://img.example.com/{i}.jpg" for i in range(rows)],
+        "TotalTime": total_time,
+        "TotalTime_str": [f"{t // 60} hrs {t % 60} mins" if t >= 60 else f"{t} mins" for t in total_time],
+        "recipe_instructions_clean": instructions,
+        "ingredients_clean": ingredient_lists,
+        "Calories": rng.gamma(2.0, 250.0, size=rows).round(1),
+    })
+    df.to_csv(out_dir / "data" / "preprocessed" / "final_recipes.csv.gzip", compression="gzip", index=False)
+
+    vectorizer = TfidfVectorizer(max_features=max_features).fit(ingredient_lists)
+    joblib.dump(vectorizer, out_dir / "models" / "tfidf_vectorizer.pkl")
+
+    n_features = len(vectorizer.vocabulary_)
+    vectors = np.lib.format.open_memmap(out_dir / "models" / "recipe_vectors.npy", mode="w+", dtype=np.float32, shape=(rows, n_features))
+    for start in range(0, rows, block_size):
+        vectors[start:start + block_size] = vectorizer.transform(ingredient_lists[start:start + block_size]).toarray()
+    vectors.flush()
+    return out_dir
+
+
+def fake_transcript(words: int = 3000, seed: int = 0) -> str:
+    """Unpunctuated caption-style text, like a raw YouTube transcript."""
+    rng = random.Random(seed)
+    return " ".join(rng.choice(TRANSCRIPT_WORDS) for _ in range(words))
+
+
+def generate_transcripts(out_dir, count: int = 10, words: int = 3000, seed: int = 0, prefix: str = "fake") -> list:
+    """Write `count` fake transcripts of about `words` words; returns their video ids."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    video_ids = []
+    for i in range(count):
+        video_id = f"{prefix}{i:0{11 - len(prefix)}d}"  # Same length as a YouTube id
+        (out_dir / f"{video_id}.txt").write_text(fake_transcript(words, seed * 1000003 + i), encoding="utf-8")
+        video_ids.append(video_id)
+    return video_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic benchmark artifacts")
+    sub = parser.add_subparsers(dest="kind", required=True)
+
+    recipes = sub.add_parser("recipes", help="ML Food Buddy-shaped recipe artifacts")
+    recipes.add_argument("out_dir")
+    recipes.add_argument("--rows", type=int, default=10000, help="e.g. 10000, 100000 or 500000")
+    recipes.add_argument("--max-features", type=int, default=256)
+    recipes.add_argument("--seed", type=int, default=0)
+
+    transcripts = sub.add_parser("transcripts", help="Fake transcript fixtures")
+    transcripts.add_argument("out_dir")
+    transcripts.add_argument("--count", type=int, default=10)
+    transcripts.add_argument("--words", type=int, default=3000)
+    transcripts.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+    if args.kind == "recipes":
+        print(generate_recipes(args.out_dir, args.rows, args.max_features, args.seed))
+    else:
+        print("\n".join(generate_transcripts(args.out_dir, args.count, args.words, args.seed)))
+
+
+if __name__ == "__main__":
+    main()
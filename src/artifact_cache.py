@@ -0,0 +1,89 @@
+import os
+import re
+import hashlib
+from singleflight import atomic_write
+from config import RAW_TRANSCRIPTS_DIR, PREPROCESSED_TRANSCRIPTS_DIR, DEFAULT_MODEL
+
+# YouTube video ids; anything else is refused before it can become part of a path
+VIDEO_ID_RE = re.compile(r"[A-Za-z0-9_-]{11}")
+# artifact_key() of a video id, with or without the model digest
+ARTIFACT_KEY_RE = re.compile(r"[A-Za-z0-9_-]{11}(_[0-9a-f]{12})?")
+CHUNK_ID_RE = re.compile(r"[0-9a-f]{16}")
+
+# kind -> (directory, file suffix, whether the artifact depends on the model, pattern of the id)
+ARTIFACT_KINDS = {
+    "raw": (RAW_TRANSCRIPTS_DIR, ".txt", False, VIDEO_ID_RE),
+    "clean": (PREPROCESSED_TRANSCRIPTS_DIR, "_clean.txt", True, VIDEO_ID_RE),
+    # Cleaned transcript chunks, keyed on a digest of the chunk text instead of a video id
+    "chunk": (os.path.join(PREPROCESSED_TRANSCRIPTS_DIR, "chunks"), "_clean.txt", True, CHUNK_ID_RE),
+}
+# Model-dependent kinds that were stored as `{video_id}{suffix}` before keys included the model
+LEGACY_KINDS = {"clean"}
+
+
+def valid_video_id(video_id) -> bool:
+    return isinstance(video_id, str) and VIDEO_ID_RE.fullmatch(video_id) is not None
+
+
+def check_key(key, pattern=ARTIFACT_KEY_RE) -> str:
+    """`key` if it matches `pattern` (an artifact key by default), else ValueError."""
+    if not isinstance(key, str) or pattern.fullmatch(key) is None:
+        raise ValueError(f"Invalid artifact key {key!r}")
+    return key
+
+
+def artifact_key(video_id: str, model: str = None) -> str:
+    """
+    Build the cache key for a video. Model-dependent artifacts get a short
+    digest of (video_id, model) appended so each model keeps its own copy.
+    """
+    if model is None:
+        return video_id
+    digest = hashlib.sha256(f"{video_id}:{model}".encode("utf-8")).hexdigest()[:12]
+    return f"{video_id}_{digest}"
+
+
+class ArtifactCache:
+    """
+    File-backed cache of per-video transcript artifacts (raw, cleaned and
+    cleaned chunks). Files keep the layout used by transcript_utils, so the
+    key doubles as its `file_name`. Personas live in the PersonaStore.
+    Unsuffixed legacy files are read (and copied to the new name) for
+    `legacy_model`. Ids not matching their kind's pattern raise ValueError.
+    """
+
+    def __init__(self, kinds: dict = None, legacy_model: str = DEFAULT_MODEL):
+        self.kinds = kinds or ARTIFACT_KINDS
+        self.legacy_model = legacy_model
+
+    def key(self, kind: str, video_id: str, model: str = None) -> str:
+        _, _, per_model, pattern = self.kinds[kind]
+        return artifact_key(check_key(video_id, pattern), model if per_model else None)
+
+    def path(self, kind: str, video_id: str, model: str = None) -> str:
+        directory, suffix, _, _ = self.kinds[kind]
+        return os.path.join(directory, f"{self.key(kind, video_id, model)}{suffix}")
+
+    def get(self, kind: str, video_id: str, model: str = None):
+        path = self.path(kind, video_id, model)
+        if not os.path.exists(path):
+            return self._import_legacy(kind, video_id, model)
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _import_legacy(self, kind: str, video_id: str, model: str = None):
+        if kind not in LEGACY_KINDS or model is None or model != self.legacy_model:
+            return None
+        directory, suffix, _, _ = self.kinds[kind]
+        legacy_path = os.path.join(directory, f"{video_id}{suffix}")
+        if not os.path.exists(legacy_path):
+            return None
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            text = f.read()
+        self.put(kind, video_id, text, model)
+        return text
+
+    def put(self, kind: str, video_id: str, text: str, model: str = None) -> str:
+        path = self.path(kind, video_id, model)
+        atomic_write(path, text)
+        return path
@@ -0,0 +1,169 @@
+"""
+Bulk critiques from a JSONL file of queries.
+
+    python src/batch_critique.py queries.jsonl -o critiques.jsonl --video-id mdqb3fVqZgM
+
+Each input line is {"id": "...", "query": "..."} (a missing id becomes the line
+number). The persona is resolved once, recommendations are computed in
+batches, and critiques run with bounded concurrency. Results are appended to
+the output as they finish, so the output doubles as the checkpoint: rerunning
+skips ids already in it. Failed ids go to `<output>.errors.jsonl` and are
+retried on the next run.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from chef_rag import ChefInferno
+from chef_service import resolve_persona
+from food_buddy_api import get_food_buddy_recommendations_batch
+from config import DEFAULT_MODEL, YOUTUBE_VIDEO_ID, BATCH_CONCURRENCY, BATCH_RECOMMEND_SIZE
+
+
+def _json_default(value):
+    # numpy scalars from the recipe table
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def read_queries(path: str) -> list:
+    items = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if not item.get("query"):
+                raise ValueError(f"{path}:{line_number}: missing 'query'")
+            items.append({"id": str(item.get("id", line_number)), "query": item["query"]})
+    return items
+
+
+def completed_ids(path: str) -> set:
+    """Ids already written to `path`; a line cut off by a crash is dropped from the file."""
+    if not os.path.exists(path):
+        return set()
+
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+    return {str(json.loads(line)["id"]) for line in data.splitlines() if line.strip()}
+
+
+class Progress:
+    """Throttled one-line throughput/ETA report on stderr."""
+
+    def __init__(self, total: int, interval: float = 0.5):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+        self.interval = interval
+        self._printed = 0.0
+
+    def update(self, failed: bool = False, force: bool = False):
+        self.done += 1
+        self.failed += failed
+        now = time.perf_counter()
+        if not force and now - self._printed < self.interval and self.done < self.total:
+            return
+        self._printed = now
+        elapsed = now - self.started
+        rate = self.done / elapsed if elapsed else 0.0
+        eta = (self.total - self.done) / rate if rate else 0.0
+        sys.stderr.write(
+            f"\r{self.done}/{self.total} done, {self.failed} failed, "
+            f"{rate:.2f} critiques/s, ETA {int(eta // 60)}m{int(eta % 60):02d}s "
+        )
+        sys.stderr.flush()
+
+
+def _critique(chef: ChefInferno, item: dict, recipes: list, model: str) -> dict:
+    started = time.perf_counter()
+    if not recipes:
+        return {**item, "error": "No recipe found"}
+    critique = chef.critique_recipe(recipes[0], item["query"], model=model)
+    if critique.startswith("❌"):
+        return {**item, "error": critique}
+    return {
+        **item,
+        "recipe": recipes[0],
+        "critique": critique,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def run_batch(input_path: str, output_path: str, video_id: str = YOUTUBE_VIDEO_ID, model: str = None,
+              concurrency: int = BATCH_CONCURRENCY, batch_size: int = BATCH_RECOMMEND_SIZE) -> dict:
+    """Critique every not-yet-completed query in `input_path`; returns counts."""
+    model = model or DEFAULT_MODEL
+    items = read_queries(input_path)
+    done = completed_ids(output_path)
+    todo = [item for item in items if item["id"] not in done]
+    print(f"{len(items)} queries, {len(items) - len(todo)} already done, {len(todo)} to go", file=sys.stderr)
+    if not todo:
+        return {"total": len(items), "skipped": len(items), "completed": 0, "failed": 0}
+
+    # One persona for the whole run
+    chef = ChefInferno(model=model)
+    persona = resolve_persona(chef, video_id, model)
+    if "error" in persona:
+        raise RuntimeError(persona["error"])
+
+    progress = Progress(len(todo))
+    errors_path = f"{output_path}.errors.jsonl"
+
+    with open(output_path, "a", encoding="utf-8") as out, open(errors_path, "a", encoding="utf-8") as errors, \
+            ThreadPoolExecutor(max_workers=concurrency) as pool:
+
+        def write(futures):
+            for future in futures:
+                record = {**future.result(), "video_id": video_id, "model": model}
+                target = errors if "error" in record else out
+                target.write(json.dumps(record, default=_json_default) + "\n")
+                target.flush()
+                progress.update(failed="error" in record)
+
+        pending = set()
+        for start in range(0, len(todo), batch_size):
+            batch = todo[start:start + batch_size]
+            recommendations = get_food_buddy_recommendations_batch([item["query"] for item in batch], top_n=1)
+            for item, recipes in zip(batch, recommendations):
+                # Keep the pool busy without queueing the whole input
+                if len(pending) >= concurrency * 2:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    write(finished)
+                pending.add(pool.submit(_critique, chef, item, recipes, model))
+
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            write(finished)
+
+    sys.stderr.write("\n")
+    return {
+        "total": len(items),
+        "skipped": len(items) - len(todo),
+        "completed": progress.done - progress.failed,
+        "failed": progress.failed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate critiques for a JSONL file of queries")
+    parser.add_argument("input", help="JSONL with one {\"id\", \"query\"} object per line")
+    parser.add_argument("-o", "--output", required=True, help="JSONL results; also the resume checkpoint")
+    parser.add_argument("--video-id", default=YOUTUBE_VIDEO_ID, help="Chef video whose persona critiques")
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="Critique calls in flight")
+    parser.add_argument("--batch-size", type=int, default=BATCH_RECOMMEND_SIZE, help="Queries per recommendation batch")
+    args = parser.parse_args()
+
+    summary = run_batch(args.input, args.output, args.video_id, args.model, args.concurrency, args.batch_size)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,57 @@
-import os
-from openai import OpenAI
-from config import OPENAI_API_KEY, PERSONAS_DIR, DEFAULT_MODEL
+import time
+import tracing
+from llm_client import get_client, chat_completion, chat_completion_async, completion_cost
+from tokens import count_tokens
+from critique_cache import critique_cache_key, get_critique_cache
+from persona_store import get_persona_store
+from prompt_builder import PromptBuilder
+from config import DEFAULT_MODEL, CRITIQUE_CACHE_ENABLED
 
 class ChefInferno:
-    def __init__(self, model: str = None):
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+    """
+    Persona generation and recipe critique. Personas live in a shared
+    PersonaStore; `chef_persona` is the default persona (the last one loaded
+    or created), and critiques can target any stored persona via `persona_id`.
+    """
+
+    def __init__(self, model: str = None, critique_cache=None, persona_store=None):
+        self.client = get_client()
         self.model = model or DEFAULT_MODEL
         self.chef_persona = None
+        self.persona_store = persona_store or get_persona_store()
+        # Optional CritiqueCache; the shared one is used when enabled in config
+        if critique_cache is None and CRITIQUE_CACHE_ENABLED:
+            critique_cache = get_critique_cache()
+        self.critique_cache = critique_cache
 
-    def save_persona(self, persona_text, file_name):
-        path = os.path.join(PERSONAS_DIR, f"{file_name}_persona.txt")
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(persona_text)
-        return path
+    def save_persona(self, persona_text, file_name, video_id: str = None, model: str = None):
+        self.persona_store.put(file_name, persona_text, video_id=video_id, model=model)
+        return file_name
 
     def load_persona(self, file_name):
-        path = os.path.join(PERSONAS_DIR, f"{file_name}_persona.txt")
-        if os.path.exists(path):
-            with open(path, "r", encoding="utf-8") as f:
-                self.chef_persona = f.read()
-                return self.chef_persona
-        return None
+        persona_text = self.persona_store.get(file_name)
+        if persona_text is not None:
+            self.chef_persona = persona_text
+        return persona_text
 
-    def create_persona_from_transcript(self, transcript_text: str, file_name: str, model: str = None) -> str:
-        if self.chef_persona:
-            return self.chef_persona  # Already loaded
+    def _resolve_persona(self, persona_id: str = None):
+        """Persona text for `persona_id`, or the default persona when no id is given."""
+        if persona_id is None:
+            return self.chef_persona
+        return self.persona_store.get(persona_id)
 
-        model = model or self.model
+    def _persona_prompt(self, transcript_text: str, model: str):
+        builder = PromptBuilder("persona", model)
+        transcript_text = builder.section("transcript", transcript_text)
 
-        try:
-            response = self.client.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a chef personality analyzer. Create concise, accurate personality descriptions."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"""Analyze this chef transcript and create a personality description:
+        return builder.build([
+            {
+                "role": "system",
+                "content": "You are a chef personality analyzer. Create concise, accurate personality descriptions."
+            },
+            {
+                "role": "user",
+                "content": f"""Analyze this chef transcript and create a personality description:
 
 TRANSCRIPT (for reference only, do NOT repeat): {transcript_text}
 
@@ -51,49 +64,118 @@ Instructions:
 6. Keep it under 200 words
 
 Write the personality description:"""
-                    }
-                ],
-                max_tokens=300,
-                temperature=0.7
-            )
+            }
+        ])
 
-            persona_text = response.choices[0].message.content.strip()
-            self.chef_persona = persona_text
-            self.save_persona(persona_text, file_name)
-            return persona_text
+    def _stored_persona(self, span, file_name: str):
+        """The stored persona for `file_name` (also made the default one), or None."""
+        persona_text = self.load_persona(file_name)
+        span.set(cache_hit=persona_text is not None)
+        return persona_text
 
-        except Exception as e:
-            return f"❌ Persona generation failed: {str(e)}"
+    def _persona_request(self, span, transcript_text: str, model: str) -> dict:
+        prompt = self._persona_prompt(transcript_text, model)
+        span.set(prompt_sections=prompt.section_tokens)
+        return dict(model=model, messages=prompt.messages, max_tokens=300, temperature=0.7)
 
-    def critique_recipe(self, recipe_data, user_query: str, model: str = None) -> str:
-        if not self.chef_persona:
-            return "❌ Create persona first"
+    def _persona_result(self, response, file_name: str, model: str, video_id: str = None) -> str:
+        persona_text = response.choices[0].message.content.strip()
+        self.chef_persona = persona_text
+        self.save_persona(persona_text, file_name, video_id=video_id, model=model)
+        return persona_text
 
+    def create_persona_from_transcript(self, transcript_text: str, file_name: str, model: str = None, video_id: str = None) -> str:
         model = model or self.model
 
+        with tracing.span("chef.persona", model=model, persona_id=file_name) as span:
+            stored = self._stored_persona(span, file_name)
+            if stored:
+                return stored
+
+            try:
+                response = chat_completion(**self._persona_request(span, transcript_text, model))
+                return self._persona_result(response, file_name, model, video_id)
+            except Exception as e:
+                span.fail(e)
+                return f"❌ Persona generation failed: {str(e)}"
+
+    async def create_persona_from_transcript_async(self, transcript_text: str, file_name: str, model: str = None, video_id: str = None) -> str:
+        model = model or self.model
+
+        with tracing.span("chef.persona", model=model, persona_id=file_name) as span:
+            stored = self._stored_persona(span, file_name)
+            if stored:
+                return stored
+
+            try:
+                response = await chat_completion_async(**self._persona_request(span, transcript_text, model))
+                return self._persona_result(response, file_name, model, video_id)
+            except Exception as e:
+                span.fail(e)
+                return f"❌ Persona generation failed: {str(e)}"
+
+    @staticmethod
+    def _recipe_name(recipe_data) -> str:
         if isinstance(recipe_data, list):
             recipe_data = recipe_data[0] if recipe_data else {}
+        return recipe_data.get("Name", recipe_data.get("name", "Unknown Recipe"))
+
+    def _prepare_critique(self, span, recipe_data, user_query: str, model: str, persona_id: str = None):
+        """
+        (answer, cache key, prompt) for a critique. `answer` is the cached
+        critique or a "❌ ..." error when no LLM call is needed; otherwise it
+        is None and `prompt` is the prompt to send.
+        """
+        persona = self._resolve_persona(persona_id)
+        if not persona:
+            span.fail("no persona")
+            return "❌ Create persona first", None, None
+
+        cache_key = cached = None
+        if self.critique_cache is not None:
+            cache_key = critique_cache_key(persona, self._recipe_name(recipe_data), model, user_query)
+            cached = self.critique_cache.get(cache_key)
+        span.set(cache_hit=cached is not None)
+        if cached is not None:
+            return cached, None, None
+        prompt = self._critique_prompt(persona, recipe_data, user_query, model)
+        span.set(prompt_sections=prompt.section_tokens)
+        return None, cache_key, prompt
+
+    @staticmethod
+    def _critique_request(prompt, model: str, **kwargs) -> dict:
+        return dict(model=model, messages=prompt.messages, max_tokens=600, temperature=0.8, **kwargs)
+
+    def _critique_result(self, cache_key, text: str) -> str:
+        """The final critique, stored in the critique cache (when there is one)."""
+        critique = text.strip()
+        if cache_key is not None and not critique.startswith("❌"):
+            self.critique_cache.put(cache_key, critique)
+        return critique
 
-        recipe_name = recipe_data.get("Name", recipe_data.get("name", "Unknown Recipe"))
+    def _critique_prompt(self, persona: str, recipe_data, user_query: str, model: str):
+        if isinstance(recipe_data, list):
+            recipe_data = recipe_data[0] if recipe_data else {}
+
+        recipe_name = self._recipe_name(recipe_data)
         ingredients = recipe_data.get("ingredients_clean", recipe_data.get("ingredients", "No ingredients"))
         instructions = recipe_data.get("recipe_instructions_clean", recipe_data.get("instructions", "No instructions"))
 
-        if len(ingredients) > 1000:
-            ingredients = ingredients[:1000] + "..."
-        if len(instructions) > 1500:
-            instructions = instructions[:1500] + "..."
+        # Pack each section into its token budget
+        builder = PromptBuilder("critique", model)
+        persona = builder.section("persona", persona)
+        user_query = builder.section("query", user_query)
+        ingredients = builder.section("ingredients", ingredients)
+        instructions = builder.section("instructions", instructions)
 
-        try:
-            response = self.client.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"You are a chef with this exact personality: {self.chef_persona}\n\nStay completely in character. Be authentic to this personality."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"""User request: "{user_query}"
+        return builder.build([
+            {
+                "role": "system",
+                "content": f"You are a chef with this exact personality: {persona}\n\nStay completely in character. Be authentic to this personality."
+            },
+            {
+                "role": "user",
+                "content": f"""User request: "{user_query}"
 
 Recipe: {recipe_name}
 Ingredients: {ingredients}
@@ -106,11 +188,73 @@ Respond in character following this structure:
 4. Finally, give the cooking instructions in your own words with your personality
 
 Keep it conversational and authentic to your character. One response, stay in character throughout:"""
-                    }
-                ],
-                max_tokens=600,
-                temperature=0.8
+            }
+        ])
+
+    def critique_recipe(self, recipe_data, user_query: str, model: str = None, persona_id: str = None) -> str:
+        model = model or self.model
+
+        with tracing.span("chef.critique", model=model, recipe=self._recipe_name(recipe_data)) as span:
+            try:
+                answer, cache_key, prompt = self._prepare_critique(span, recipe_data, user_query, model, persona_id)
+                if answer is not None:
+                    return answer
+                response = chat_completion(**self._critique_request(prompt, model))
+                return self._critique_result(cache_key, response.choices[0].message.content)
+            except Exception as e:
+                span.fail(e)
+                return f"❌ Recipe critique failed: {str(e)}"
+
+    async def critique_recipe_async(self, recipe_data, user_query: str, model: str = None, persona_id: str = None) -> str:
+        model = model or self.model
+
+        with tracing.span("chef.critique", model=model, recipe=self._recipe_name(recipe_data)) as span:
+            try:
+                answer, cache_key, prompt = self._prepare_critique(span, recipe_data, user_query, model, persona_id)
+                if answer is not None:
+                    return answer
+                response = await chat_completion_async(**self._critique_request(prompt, model))
+                return self._critique_result(cache_key, response.choices[0].message.content)
+            except Exception as e:
+                span.fail(e)
+                return f"❌ Recipe critique failed: {str(e)}"
+
+    def critique_recipe_stream(self, recipe_data, user_query: str, model: str = None, persona_id: str = None):
+        """
+        Same as critique_recipe, but yields text chunks as the completion streams in.
+        Errors are yielded as a final "❌ ..." chunk.
+        """
+        model = model or self.model
+
+        # Not made current: the consumer runs between yields, in its own context
+        span = tracing.span("chef.critique", model=model, recipe=self._recipe_name(recipe_data), stream=True)
+        try:
+            answer, cache_key, prompt = self._prepare_critique(span, recipe_data, user_query, model, persona_id)
+            if answer is not None:
+                yield answer
+                return
+
+            started = time.perf_counter()
+            stream = chat_completion(**self._critique_request(prompt, model, stream=True))
+            parts = []
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if not parts:
+                        span.set(ttft_ms=(time.perf_counter() - started) * 1000)
+                    parts.append(chunk.choices[0].delta.content)
+                    yield parts[-1]
+            critique = self._critique_result(cache_key, "".join(parts))
+
+            # Streams carry no usage; estimate it from the prompt and output
+            completion_tokens = count_tokens(critique, model)
+            span.set(
+                prompt_tokens=prompt.total_tokens,
+                completion_tokens=completion_tokens,
+                cost_usd=completion_cost(model, prompt.total_tokens, completion_tokens),
+                tokens_estimated=True,
             )
-            return response.choices[0].message.content.strip()
         except Exception as e:
-            return f"❌ Recipe critique failed: {str(e)}"
\ No newline at end of file
+            span.fail(e)
+            yield f"❌ Recipe critique failed: {str(e)}"
+        finally:
+            span.end()
@@ -1,45 +1,281 @@
-from transcript_utils import clean_transcript_text
+import os
+import asyncio
+import tracing
+from transcript_utils import clean_transcript_text, clean_transcript_text_async
 from chef_rag import ChefInferno
 from food_buddy_api import get_food_buddy_recommendations
-from youtube_transcript_api import YouTubeTranscriptApi
-from config import DEFAULT_MODEL
+from artifact_cache import ArtifactCache, artifact_key, check_key, valid_video_id
+from singleflight import SingleFlight, FileLock
+from config import DEFAULT_MODEL, TRANSCRIPT_FIXTURES_DIR, LOCKS_DIR
 
-def generate_chef_response(video_id: str, user_query: str, model: str = None) -> dict:
+artifacts = ArtifactCache()
+# Cold personas are produced once per (video_id, model), however many requests ask at once
+persona_flights = SingleFlight()
+
+
+def _persona_lock(persona_name: str) -> FileLock:
+    return FileLock(os.path.join(LOCKS_DIR, f"{check_key(persona_name)}.lock"))
+
+
+def fetch_transcript(video_id: str, fixtures_dir=None) -> str:
     """
-    Fetch transcript, create persona, get recipe, and generate critique.
-    Returns a dict with persona, cleaned transcript, and critique.
+    Fetch the raw YouTube transcript as a single string, or read
+    `{video_id}.txt` from `fixtures_dir` (default TRANSCRIPT_FIXTURES_DIR) when set.
     """
-    model = model or DEFAULT_MODEL
-    file_name = video_id
+    fixtures_dir = fixtures_dir or TRANSCRIPT_FIXTURES_DIR
+    if fixtures_dir:
+        with open(os.path.join(fixtures_dir, f"{video_id}.txt"), "r", encoding="utf-8") as f:
+            return f.read()
+
+    from youtube_transcript_api import YouTubeTranscriptApi  # Only needed on a cache miss
+    api = YouTubeTranscriptApi()
+    raw_transcript_obj = api.fetch(video_id)
+    return " ".join([s.text for s in raw_transcript_obj])
+
+
+def resolve_raw_transcript(video_id: str, fixtures_dir=None) -> str:
+    """Return the cached raw transcript, fetching it from YouTube on a miss."""
+    with tracing.span("stage.fetch_transcript", video_id=video_id) as span:
+        raw_text = artifacts.get("raw", video_id)
+        span.set(cache_hit=raw_text is not None)
+        if raw_text is None:
+            raw_text = fetch_transcript(video_id, fixtures_dir)
+            artifacts.put("raw", video_id, raw_text)
+        return raw_text
+
+
+def _clean_span(video_id: str, model: str):
+    return tracing.span("stage.clean_transcript", video_id=video_id, model=model, cache_hit=False)
+
+
+def _cleaned(span, cleaned_text: str) -> str:
+    if cleaned_text.startswith("❌"):
+        span.fail(cleaned_text)
+    return cleaned_text
+
+
+def resolve_cleaned_transcript(video_id: str, model: str) -> str:
+    """Return the cached cleaned transcript, cleaning the raw one on a miss."""
+    cleaned_text = artifacts.get("clean", video_id, model)
+    if cleaned_text is None:
+        raw_text = resolve_raw_transcript(video_id)
+        with _clean_span(video_id, model) as span:
+            file_name = artifacts.key("clean", video_id, model)
+            cleaned_text = _cleaned(span, clean_transcript_text(raw_text, file_name, model=model, save_raw=False))
+    return cleaned_text
+
+
+async def resolve_cleaned_transcript_async(video_id: str, model: str) -> str:
+    """Async version of resolve_cleaned_transcript; the raw transcript is resolved in a thread."""
+    cleaned_text = artifacts.get("clean", video_id, model)
+    if cleaned_text is None:
+        raw_text = await asyncio.to_thread(resolve_raw_transcript, video_id)
+        with _clean_span(video_id, model) as span:
+            file_name = artifacts.key("clean", video_id, model)
+            cleaned_text = _cleaned(span, await clean_transcript_text_async(raw_text, file_name, model=model, save_raw=False))
+    return cleaned_text
+
+
+def _recommend(user_query: str) -> list:
+    with tracing.span("stage.recommend") as span:
+        recipes = get_food_buddy_recommendations(user_query)
+        span.set(results=len(recipes))
+        return recipes
 
-    # Fetch YouTube transcript
-    try:
-        api = YouTubeTranscriptApi()
-        raw_transcript_obj = api.fetch(video_id)
-        raw_text = " ".join([s.text for s in raw_transcript_obj])
 
-    except Exception as e:
-        return {"error": f"Failed to fetch transcript: {str(e)}"}
+def _stored_persona(chef: ChefInferno, video_id: str, model: str):
+    persona = chef.load_persona(artifact_key(video_id, model))
+    if persona:
+        return {"persona": persona, "cleaned_transcript": artifacts.get("clean", video_id, model) or ""}
+    return None
 
-    # Clean transcript
-    cleaned_text = clean_transcript_text(raw_text, file_name, model=model)
 
-    # Instantiate Chef
+def _persona_result(cleaned_text: str, persona: str) -> dict:
+    if persona.startswith("❌"):
+        return {"error": persona}
+    return {"persona": persona, "cleaned_transcript": cleaned_text}
+
+
+def _resolved(span, chef: ChefInferno, result: dict) -> dict:
+    if "error" in result:
+        span.fail(result["error"])
+    else:
+        chef.chef_persona = result["persona"]  # Followers did not run the producer
+    return result
+
+
+def _produce_persona(chef: ChefInferno, video_id: str, model: str) -> dict:
+    """Fetch, clean and build the persona while holding the cross-process lock for it."""
+    persona_name = artifact_key(video_id, model)
+    with _persona_lock(persona_name):
+        # Another process may have produced it while we waited for the lock
+        stored = _stored_persona(chef, video_id, model)
+        if stored:
+            return stored
+
+        # Fetch and clean transcript
+        try:
+            cleaned_text = resolve_cleaned_transcript(video_id, model)
+        except Exception as e:
+            return {"error": f"Failed to fetch transcript: {str(e)}"}
+
+        if cleaned_text.startswith("❌"):
+            return {"error": cleaned_text}
+
+        persona = chef.create_persona_from_transcript(cleaned_text, persona_name, model=model, video_id=video_id)
+        return _persona_result(cleaned_text, persona)
+
+
+def resolve_persona(chef: ChefInferno, video_id: str, model: str) -> dict:
+    """
+    Persona (and cleaned transcript) for a video, generated on a miss; sets it as
+    the chef's default persona. Returns a dict with persona and cleaned_transcript,
+    or a dict with an error.
+    """
+    with tracing.span("stage.persona", video_id=video_id, model=model) as span:
+        if not valid_video_id(video_id):
+            return _resolved(span, chef, {"error": f"Invalid YouTube video id {video_id!r}"})
+        stored = _stored_persona(chef, video_id, model)
+        span.set(cache_hit=stored is not None)
+        if stored:
+            return stored
+
+        return _resolved(span, chef, persona_flights.do((video_id, model), _produce_persona, chef, video_id, model))
+
+
+def prepare_chef_context(video_id: str, user_query: str, model: str = None) -> dict:
+    """
+    Resolve persona (fetching and cleaning the transcript only on a cache miss)
+    and get recipe. Returns a dict with chef, persona, cleaned transcript and recipe,
+    or a dict with an error.
+    """
+    model = model or DEFAULT_MODEL
+
+    # Instantiate Chef and try the persona store first
     chef = ChefInferno(model=model)
-    persona = chef.load_persona(file_name) or chef.create_persona_from_transcript(
-        cleaned_text, file_name, model=model
-    )
+    persona_result = resolve_persona(chef, video_id, model)
+    if "error" in persona_result:
+        return persona_result
+    persona, cleaned_text = persona_result["persona"], persona_result["cleaned_transcript"]
 
     # Fetch recipe
-    recipe = get_food_buddy_recommendations(user_query)
+    recipe = _recommend(user_query)
     if not recipe:
         return {"error": "No recipe found"}
 
-    # Generate critique
-    critique = chef.critique_recipe(recipe[0], user_query, model=model)
-
     return {
+        "chef": chef,
         "persona": persona,
         "cleaned_transcript": cleaned_text,
+        "recipe": recipe[0]
+    }
+
+
+def generate_chef_response(video_id: str, user_query: str, model: str = None) -> dict:
+    """
+    Resolve persona, get recipe, and generate critique.
+    Returns a dict with persona, cleaned transcript, and critique.
+    """
+    model = model or DEFAULT_MODEL
+    with tracing.span("chef_response", video_id=video_id, model=model) as span:
+        context = prepare_chef_context(video_id, user_query, model=model)
+        if "error" in context:
+            span.fail(context["error"])
+            return context
+
+        # Generate critique
+        critique = context["chef"].critique_recipe(context["recipe"], user_query, model=model)
+        if critique.startswith("❌"):
+            span.fail(critique)
+
+    return {
+        "persona": context["persona"],
+        "cleaned_transcript": context["cleaned_transcript"],
+        "critique": critique
+    }
+
+
+def generate_chef_response_stream(video_id: str, user_query: str, model: str = None) -> dict:
+    """
+    Like generate_chef_response, but "critique_stream" is an iterator of
+    critique text chunks that streams as the completion is generated.
+    """
+    model = model or DEFAULT_MODEL
+    # Covers preparation only; the critique stream is traced as it is consumed
+    with tracing.span("chef_response", video_id=video_id, model=model, stream=True) as span:
+        context = prepare_chef_context(video_id, user_query, model=model)
+        if "error" in context:
+            span.fail(context["error"])
+            return context
+
+    return {
+        "persona": context["persona"],
+        "cleaned_transcript": context["cleaned_transcript"],
+        "critique_stream": context["chef"].critique_recipe_stream(context["recipe"], user_query, model=model)
+    }
+
+
+async def _produce_persona_async(chef: ChefInferno, video_id: str, model: str) -> dict:
+    persona_name = artifact_key(video_id, model)
+    async with _persona_lock(persona_name):
+        stored = _stored_persona(chef, video_id, model)
+        if stored:
+            return stored
+
+        try:
+            cleaned_text = await resolve_cleaned_transcript_async(video_id, model)
+        except Exception as e:
+            return {"error": f"Failed to fetch transcript: {str(e)}"}
+
+        if cleaned_text.startswith("❌"):
+            return {"error": cleaned_text}
+
+        persona = await chef.create_persona_from_transcript_async(cleaned_text, persona_name, model=model, video_id=video_id)
+        return _persona_result(cleaned_text, persona)
+
+
+async def resolve_persona_async(chef: ChefInferno, video_id: str, model: str) -> dict:
+    with tracing.span("stage.persona", video_id=video_id, model=model) as span:
+        if not valid_video_id(video_id):
+            return _resolved(span, chef, {"error": f"Invalid YouTube video id {video_id!r}"})
+        stored = _stored_persona(chef, video_id, model)
+        span.set(cache_hit=stored is not None)
+        if stored:
+            return stored
+
+        return _resolved(span, chef, await persona_flights.do_async((video_id, model), _produce_persona_async, chef, video_id, model))
+
+
+async def generate_chef_response_async(video_id: str, user_query: str, model: str = None) -> dict:
+    """
+    Async version of generate_chef_response. Recommendation only depends on the
+    query, so it runs in a thread executor while the transcript and persona are
+    resolved; the critique awaits both.
+    """
+    model = model or DEFAULT_MODEL
+    with tracing.span("chef_response", video_id=video_id, model=model) as span:
+        loop = asyncio.get_running_loop()
+        recipe_future = loop.run_in_executor(None, tracing.wrap(_recommend), user_query)
+
+        chef = ChefInferno(model=model)
+        persona_result = await resolve_persona_async(chef, video_id, model)
+        if "error" in persona_result:
+            span.fail(persona_result["error"])
+            return persona_result
+
+        # Fetch recipe
+        recipe = await recipe_future
+        if not recipe:
+            span.fail("No recipe found")
+            return {"error": "No recipe found"}
+
+        # Generate critique
+        critique = await chef.critique_recipe_async(recipe[0], user_query, model=model)
+        if critique.startswith("❌"):
+            span.fail(critique)
+
+    return {
+        "persona": persona_result["persona"],
+        "cleaned_transcript": persona_result["cleaned_transcript"],
         "critique": critique
     }
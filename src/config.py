@@ -10,10 +10,94 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "") # Load from .env or set directl
 DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")  # Default LLM or override in .env
 YOUTUBE_VIDEO_ID = os.getenv("YOUTUBE_VIDEO_ID", "mdqb3fVqZgM")  # Default or override in .env
 
+# Shared OpenAI client: connection pool, quota and retry policy
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None  # Optional OpenAI-compatible endpoint
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "32"))
+# Client-side rate limits; 0 (the default) leaves that dimension unlimited
+OPENAI_RPM_LIMIT = int(os.getenv("OPENAI_RPM_LIMIT") or "0")  # Requests per minute
+OPENAI_TPM_LIMIT = int(os.getenv("OPENAI_TPM_LIMIT") or "0")  # Tokens per minute
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+
+# Transcript cleaning: transcripts are cleaned in token-bounded chunks in parallel
+CLEAN_CHUNK_TOKENS = int(os.getenv("CLEAN_CHUNK_TOKENS", "700"))
+CLEAN_MAX_CONCURRENCY = int(os.getenv("CLEAN_MAX_CONCURRENCY", "8"))
+
+# Prompt token budgets per section; MODEL_PROMPT_BUDGETS overrides them per model
+PROMPT_BUDGETS = {
+    "critique": {"persona": 400, "query": 150, "ingredients": 300, "instructions": 600},
+    "persona": {"transcript": 6000},
+}
+MODEL_PROMPT_BUDGETS = {
+    "gpt-3.5-turbo": {"persona": {"transcript": 2500}},
+}
+
 # Project root is one level up from src/
 PROJECT_ROOT = Path(__file__).resolve().parent.parent  
 
-DATA_DIR = PROJECT_ROOT / "data"
+DATA_DIR = Path(os.getenv("CHEF_DATA_DIR", PROJECT_ROOT / "data"))  # Override to keep runs out of the repo
 RAW_TRANSCRIPTS_DIR = DATA_DIR / "raw" / "transcripts"
 PREPROCESSED_TRANSCRIPTS_DIR = DATA_DIR / "preprocessed" / "transcripts"
 PERSONAS_DIR = DATA_DIR / "preprocessed" / "personas"
+
+# Directory of `{video_id}.txt` transcripts used instead of YouTube (offline runs)
+TRANSCRIPT_FIXTURES_DIR = os.getenv("TRANSCRIPT_FIXTURES_DIR") or None
+
+# Lock files that let one process at a time produce a given persona/transcript
+LOCKS_DIR = Path(os.getenv("CHEF_LOCKS_DIR", DATA_DIR / "locks"))
+
+# Persona repository (single SQLite file) and its in-memory LRU size
+PERSONA_STORE_PATH = Path(os.getenv("PERSONA_STORE_PATH", PERSONAS_DIR / "personas.sqlite3"))
+PERSONA_CACHE_ENTRIES = int(os.getenv("PERSONA_CACHE_ENTRIES", "64"))
+
+# Critique response cache (in-memory LRU in front of a SQLite store)
+CACHE_DIR = DATA_DIR / "cache"
+CRITIQUE_CACHE_ENABLED = os.getenv("CRITIQUE_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+CRITIQUE_CACHE_PATH = Path(os.getenv("CRITIQUE_CACHE_PATH", CACHE_DIR / "critiques.sqlite3"))
+CRITIQUE_CACHE_TTL = int(os.getenv("CRITIQUE_CACHE_TTL", str(7 * 24 * 3600)))  # Seconds
+CRITIQUE_CACHE_MAX_ENTRIES = int(os.getenv("CRITIQUE_CACHE_MAX_ENTRIES", "10000"))  # On disk
+CRITIQUE_CACHE_MEMORY_ENTRIES = int(os.getenv("CRITIQUE_CACHE_MEMORY_ENTRIES", "512"))
+
+# Tracing: comma-separated span sinks ("json", "histogram", "otel"); empty disables tracing
+TRACE_SINKS = os.getenv("TRACE_SINKS", "")
+
+# USD per 1M (prompt, completion) tokens, matched on the longest model-name prefix
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+# Headless HTTP server (src/server.py): worker threads and the bounded request queue
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "8"))
+SERVER_QUEUE_SIZE = int(os.getenv("SERVER_QUEUE_SIZE", "64"))  # Connections waiting for a worker before 503s
+SERVER_SOCKET_TIMEOUT = float(os.getenv("SERVER_SOCKET_TIMEOUT", "30"))  # Seconds a client may stall a read or write
+
+# Bulk critiques (src/batch_critique.py)
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))  # Critique calls in flight
+BATCH_RECOMMEND_SIZE = int(os.getenv("BATCH_RECOMMEND_SIZE", "64"))  # Queries per recommendation batch
+
+# Recommendation query cache: TF-IDF vectors and top-k row ids per canonical query
+QUERY_CACHE_ENTRIES = int(os.getenv("QUERY_CACHE_ENTRIES", "4096"))
+
+# Shared recommender artifacts (src/shared_artifacts.py): workers attach to the version
+# published in this directory (e.g. /dev/shm/chef-inferno) instead of ML_BUDDY_PATH
+SHARED_ARTIFACTS_DIR = os.getenv("SHARED_ARTIFACTS_DIR") or None
+SHARED_ARTIFACTS_CHECK_SECONDS = float(os.getenv("SHARED_ARTIFACTS_CHECK_SECONDS", "5"))
+
+# Persona ingestion (src/ingest_personas.py): parallel transcript fetches and LLM pipelines
+INGEST_FETCH_WORKERS = int(os.getenv("INGEST_FETCH_WORKERS", "16"))
+INGEST_LLM_WORKERS = int(os.getenv("INGEST_LLM_WORKERS", "4"))  # Videos cleaned/summarized at once
+
+# Delta recipe segment (src/delta_index.py): append-only JSONL of recipes added on top of
+# the ML Food Buddy index, re-read by running processes within DELTA_CHECK_SECONDS
+DELTA_RECIPES_PATH = Path(os.getenv("DELTA_RECIPES_PATH", DATA_DIR / "delta" / "recipes.jsonl"))
+DELTA_CHECK_SECONDS = float(os.getenv("DELTA_CHECK_SECONDS", "1"))
+
+# Fuzzy ingredient correction before vectorization (src/ingredient_corrector.py):
+# out-of-vocabulary words scoring at least the cutoff (rapidfuzz ratio, 0-100) are replaced
+INGREDIENT_CORRECTION_ENABLED = os.getenv("INGREDIENT_CORRECTION_ENABLED", "true").lower() in ("1", "true", "yes")
+INGREDIENT_CORRECTION_CUTOFF = float(os.getenv("INGREDIENT_CORRECTION_CUTOFF", "80"))
+INGREDIENT_CORRECTION_CACHE = int(os.getenv("INGREDIENT_CORRECTION_CACHE", "4096"))  # Corrected words kept
@@ -0,0 +1,117 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from lru import LRUCache
+from query_utils import normalize_query
+from config import (
+    CRITIQUE_CACHE_PATH,
+    CRITIQUE_CACHE_TTL,
+    CRITIQUE_CACHE_MAX_ENTRIES,
+    CRITIQUE_CACHE_MEMORY_ENTRIES,
+)
+
+
+def critique_cache_key(persona: str, recipe_name: str, model: str, user_query: str) -> str:
+    """Hash of the persona text, recipe name, model and normalized ingredient query."""
+    persona_hash = hashlib.sha256(persona.encode("utf-8")).hexdigest()
+    parts = [persona_hash, recipe_name, model, normalize_query(user_query)]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class CritiqueCache:
+    """
+    Two-tier cache of critique responses: an in-memory LRU in front of a
+    SQLite store with a TTL and a bound on the number of stored entries
+    (least recently used entries are evicted first).
+    """
+
+    def __init__(self, path=CRITIQUE_CACHE_PATH, ttl: int = CRITIQUE_CACHE_TTL,
+                 max_entries: int = CRITIQUE_CACHE_MAX_ENTRIES,
+                 memory_entries: int = CRITIQUE_CACHE_MEMORY_ENTRIES):
+        self.path = str(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory = LRUCache(memory_entries)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS critiques ("
+                "key TEXT PRIMARY KEY, critique TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS critiques_accessed ON critiques (accessed_at)")
+
+    def get(self, key: str):
+        now = time.time()
+        entry = self.memory.get(key)
+        if entry is not None and now - entry[1] < self.ttl:
+            self.memory_hits += 1
+            return entry[0]
+
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT critique, created_at FROM critiques WHERE key = ? AND created_at > ?",
+                (key, now - self.ttl)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE critiques SET accessed_at = ? WHERE key = ?", (now, key))
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.disk_hits += 1
+        self.memory.put(key, (row[0], row[1]))
+        return row[0]
+
+    def put(self, key: str, critique: str):
+        now = time.time()
+        self.memory.put(key, (critique, now))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO critiques (key, critique, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, critique, now, now)
+            )
+            self._conn.execute("DELETE FROM critiques WHERE created_at <= ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM critiques WHERE key IN ("
+                "SELECT key FROM critiques ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        self.memory.clear()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM critiques")
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_critique_cache() -> CritiqueCache:
+    """Process-wide critique cache at CRITIQUE_CACHE_PATH."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = CritiqueCache()
+    return _default_cache
@@ -0,0 +1,362 @@
+"""
+Recipes added on top of the ML Food Buddy index without rebuilding it.
+
+    python src/delta_index.py add new_recipes.jsonl      # one recipe object per line
+    python src/delta_index.py remove "Recipe Name" ["Other Name" ...]
+    python src/delta_index.py compact
+    python src/delta_index.py status
+
+New recipes are vectorized with the existing TF-IDF vectorizer and appended,
+together with their sparse vector, to an append-only JSONL log
+(DELTA_RECIPES_PATH). A later entry for the same Name supersedes the earlier
+one, and removals are appended as tombstones. Running recommenders stat the
+log at most every DELTA_CHECK_SECONDS, parse only the bytes appended since
+their last read and swap in a new immutable DeltaSegment from a background
+thread, so queries never wait on an update; after a failed refresh the next
+attempt is put off exponentially longer. Lines that cannot be parsed are
+skipped and counted. Compaction rewrites the log with live entries only
+(dropping those lines); it runs after an append once superseded lines
+outnumber live ones, or on demand.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+import numpy as np
+from scipy.sparse import csr_matrix
+from recipe_store import hash_names
+from singleflight import FileLock, atomic_write
+from config import DELTA_RECIPES_PATH, DELTA_CHECK_SECONDS
+
+# Recipe fields kept in the log; Name and ingredients_clean are required
+RECIPE_FIELDS = [
+    "Name", "Image_first", "TotalTime", "TotalTime_str",
+    "recipe_instructions_clean", "ingredients_clean", "Calories",
+]
+
+# Automatic compaction only once the log has at least this many lines
+COMPACT_MIN_LINES = 256
+# Longest wait before retrying a refresh that keeps failing
+REFRESH_BACKOFF_MAX = 300.0
+
+logger = logging.getLogger("chef_inferno.delta")
+
+# Parsed log: live entries by Name (oldest first), file identity, how far it was read,
+# and the number of lines read and of unparsable ones among them
+_LogState = namedtuple("_LogState", "entries inode offset size lines corrupt")
+_EMPTY_LOG = _LogState({}, None, 0, 0, 0, 0)
+
+
+def _minutes(value) -> float:
+    """TotalTime as minutes; ISO 8601 durations (e.g. "PT45M") are converted."""
+    if value is None or value == "":
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    import pandas as pd
+    minutes = pd.to_timedelta(value, errors="coerce").total_seconds() / 60
+    return float(minutes) if minutes == minutes else np.nan
+
+
+def _float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _recipe(record: dict) -> dict:
+    if not isinstance(record, dict) or not record.get("Name") or not record.get("ingredients_clean"):
+        raise ValueError(f"Recipe needs 'Name' and 'ingredients_clean': {record!r}")
+    recipe = {field: record.get(field) for field in RECIPE_FIELDS}
+    recipe["Name"] = str(recipe["Name"])
+    recipe["ingredients_clean"] = str(recipe["ingredients_clean"])
+    return recipe
+
+
+def _entry_name(entry: dict) -> str:
+    return entry["recipe"]["Name"] if entry["op"] == "add" else entry["Name"]
+
+
+def _parse_entry(line: bytes) -> dict:
+    """Log entry on `line`; ValueError when it is not a well-formed add or remove."""
+    entry = json.loads(line)
+    if not isinstance(entry, dict) or entry.get("op") not in ("add", "remove"):
+        raise ValueError("not a log entry")
+    if entry["op"] == "remove":
+        if not isinstance(entry.get("Name"), str):
+            raise ValueError("remove without a Name")
+    else:
+        _recipe(entry.get("recipe"))
+        if not isinstance(entry.get("indices"), list) or not isinstance(entry.get("data"), list) \
+                or len(entry["indices"]) != len(entry["data"]):
+            raise ValueError("add without a sparse vector")
+    return entry
+
+
+class DeltaSegment:
+    """Immutable snapshot of the live delta recipes: sparse vectors, metadata and filter columns."""
+
+    def __init__(self, entries, matrix, version: str):
+        self.version = version
+        self.matrix = matrix  # csr, one L2-normalized TF-IDF row per recipe (None when empty)
+        self.recipes = [entry["recipe"] for entry in entries]
+        self.names = np.array([recipe["Name"] for recipe in self.recipes], dtype=object)
+        self.total_time = np.array([_minutes(recipe.get("TotalTime")) for recipe in self.recipes], dtype=float)
+        self.calories = np.array([_float(recipe.get("Calories")) for recipe in self.recipes], dtype=float)
+        self._name_hashes = None
+
+    def __len__(self):
+        return len(self.recipes)
+
+    @property
+    def name_hashes(self):
+        """Name hashes computed like the base recipes' names, for duplicate checks against them."""
+        if self._name_hashes is None:
+            self._name_hashes = hash_names(self.names)
+        return self._name_hashes
+
+    def record(self, position: int, columns) -> dict:
+        recipe = self.recipes[position]
+        record = {column: recipe.get(column) for column in columns}
+        if "Calories" in record:
+            calories = _float(record["Calories"])
+            record["Calories"] = calories if np.isfinite(calories) else None
+        return record
+
+
+class DeltaIndex:
+    """
+    Handle on the delta log. `segment()` returns the current DeltaSegment and
+    triggers a background refresh when the log changed; `add`, `remove` and
+    `compact` update the log under a cross-process lock. `encode` turns
+    ingredient texts into sparse TF-IDF rows and `vectorizer_version`
+    identifies that vectorizer; entries stamped with another version are
+    re-encoded when loaded. Both are only needed to add or load recipes.
+    """
+
+    def __init__(self, path=DELTA_RECIPES_PATH, encode=None, vectorizer_version: str = None,
+                 check_interval: float = DELTA_CHECK_SECONDS):
+        self.path = Path(path)
+        self.encode = encode
+        self.vectorizer_version = vectorizer_version
+        self.check_interval = check_interval
+        self._state = _EMPTY_LOG  # What the current segment was built from
+        self._write_state = _EMPTY_LOG  # Writers' view, only touched under the file lock
+        self._segment = None
+        self._checked = 0.0
+        self._refreshing = False
+        self._failures = 0  # Refreshes failed in a row
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def _file_lock(self) -> FileLock:
+        return FileLock(self.path.with_name(self.path.name + ".lock"))
+
+    def _read(self, state: _LogState) -> _LogState:
+        """Apply the entries appended since `state`; starts over when the log was replaced."""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return _EMPTY_LOG
+        with f:
+            stat = os.fstat(f.fileno())
+            if stat.st_ino != state.inode or stat.st_size < state.offset:
+                state = _EMPTY_LOG
+            f.seek(state.offset)
+            data = f.read(stat.st_size - state.offset)
+
+        # A partially appended last line is picked up by the next read
+        end = data.rfind(b"\n") + 1
+        entries = dict(state.entries)
+        lines, corrupt = state.lines, state.corrupt
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            lines += 1
+            try:
+                entry = _parse_entry(line)
+            except ValueError as e:  # json.JSONDecodeError and UnicodeDecodeError included
+                corrupt += 1
+                logger.warning("Skipping unreadable line %d of %s: %s", lines, self.path, e)
+                continue
+            name = _entry_name(entry)
+            entries.pop(name, None)  # Re-inserted last: order follows the latest write
+            if entry["op"] == "add":
+                entries[name] = entry
+        return _LogState(entries, stat.st_ino, state.offset + end, stat.st_size, lines, corrupt)
+
+    def _build(self, state: _LogState) -> DeltaSegment:
+        entries = list(state.entries.values())
+        version = f"{state.inode}:{state.offset}"
+        if not entries:
+            return DeltaSegment([], None, version)
+        probe = self.encode([""])  # Width and dtype of the vectorizer's rows
+        stale = [i for i, entry in enumerate(entries) if entry.get("vectorizer") != self.vectorizer_version]
+        if stale:
+            fresh = self.encode([entries[i]["recipe"]["ingredients_clean"] for i in stale])
+            for row, i in enumerate(stale):
+                vector = fresh[row]
+                entries[i] = {**entries[i], "indices": vector.indices.tolist(), "data": vector.data.tolist()}
+
+        indptr = np.cumsum([0] + [len(entry["indices"]) for entry in entries])
+        indices = np.array([i for entry in entries for i in entry["indices"]], dtype=np.int32)
+        data = np.array([v for entry in entries for v in entry["data"]], dtype=probe.dtype)
+        matrix = csr_matrix((data, indices, indptr), shape=(len(entries), probe.shape[1]))
+        return DeltaSegment(entries, matrix, version)
+
+    def _changed(self) -> bool:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return self._state.inode is not None
+        return (stat.st_ino, stat.st_size) != (self._state.inode, self._state.size)
+
+    def _refresh(self):
+        try:
+            state = self._read(self._state)
+            segment = self._build(state)
+            with self._lock:
+                self._state, self._segment = state, segment
+            self._failures = 0
+        except Exception:
+            # Keep serving the current segment; retry later, backing off while it keeps failing
+            self._failures += 1
+            delay = min(REFRESH_BACKOFF_MAX, max(self.check_interval, 1.0) * 2 ** self._failures)
+            self._retry_at = time.monotonic() + delay
+            logger.exception("Delta refresh of %s failed %d time(s); retrying in %.0fs", self.path, self._failures, delay)
+        finally:
+            self._refreshing = False
+
+    def segment(self) -> DeltaSegment:
+        """Current segment; the first call loads it, later changes are swapped in by a background thread."""
+        now = time.monotonic()
+        if self._segment is not None and now - self._checked < self.check_interval:
+            return self._segment
+
+        with self._lock:
+            self._checked = now
+            if self._segment is None:
+                self._state = self._read(_EMPTY_LOG)
+                self._segment = self._build(self._state)
+            elif not self._refreshing and now >= self._retry_at and self._changed():
+                self._refreshing = True
+                threading.Thread(target=self._refresh, name="delta-refresh", daemon=True).start()
+            return self._segment
+
+    def _append(self, entries):
+        payload = "".join(json.dumps(entry) + "\n" for entry in entries).encode("utf-8")
+        with self._file_lock():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, payload)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+            self._write_state = self._read(self._write_state)
+            state = self._write_state
+            if state.lines >= COMPACT_MIN_LINES and state.lines > 2 * len(state.entries):
+                self._compact(state)
+
+    def add(self, recipes) -> int:
+        """Vectorize and append `recipes` (dicts with at least Name and ingredients_clean)."""
+        recipes = [_recipe(record) for record in recipes]
+        if not recipes:
+            return 0
+        vectors = self.encode([recipe["ingredients_clean"] for recipe in recipes])
+        self._append([
+            {"op": "add", "recipe": recipe, "vectorizer": self.vectorizer_version,
+             "indices": vectors[row].indices.tolist(), "data": vectors[row].data.tolist()}
+            for row, recipe in enumerate(recipes)
+        ])
+        return len(recipes)
+
+    def remove(self, names) -> int:
+        names = [str(name) for name in names]
+        self._append([{"op": "remove", "Name": name} for name in names])
+        return len(names)
+
+    def _compact(self, state: _LogState):
+        # Called with the file lock held; the rename gives readers a new inode to reload
+        entries = list(state.entries.values())
+        if self.encode is not None:
+            # Entries stamped with another vectorizer are re-encoded on the way
+            segment = self._build(state)
+            entries = [
+                {"op": "add", "recipe": recipe, "vectorizer": self.vectorizer_version,
+                 "indices": row.indices.tolist(), "data": row.data.tolist()}
+                for recipe, row in zip(segment.recipes, segment.matrix)
+            ]
+        atomic_write(self.path, "".join(json.dumps(entry) + "\n" for entry in entries))
+        self._write_state = self._read(_EMPTY_LOG)
+
+    def compact(self) -> dict:
+        """Rewrite the log with live entries only; returns status before and after."""
+        with self._file_lock():
+            before = self.status()
+            self._compact(self._read(_EMPTY_LOG))
+            return {"before": before, "after": self.status()}
+
+    def status(self) -> dict:
+        state = self._read(_EMPTY_LOG)
+        return {
+            "path": str(self.path),
+            "recipes": len(state.entries),
+            "lines": state.lines,
+            "superseded": state.lines - state.corrupt - len(state.entries),
+            "corrupt": state.corrupt,
+            "bytes": state.size,
+        }
+
+
+def read_recipes(path: str) -> list:
+    """Recipes from a JSON list or a JSONL file."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def main():
+    from food_buddy_api import ML_BUDDY_PATH, FoodBuddyRecommender
+
+    parser = argparse.ArgumentParser(description="Add recipes on top of the recommender index")
+    parser.add_argument("--path", default=DELTA_RECIPES_PATH, help="Delta log (default DELTA_RECIPES_PATH)")
+    parser.add_argument("--root", default=ML_BUDDY_PATH, help="ML Food Buddy project whose vectorizer encodes recipes")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add_parser = sub.add_parser("add", help="Append recipes from a JSON/JSONL file")
+    add_parser.add_argument("file")
+    remove_parser = sub.add_parser("remove", help="Remove recipes by name")
+    remove_parser.add_argument("names", nargs="+")
+    sub.add_parser("compact", help="Rewrite the log with live entries only")
+    sub.add_parser("status", help="Show live and superseded entries")
+    args = parser.parse_args()
+
+    if args.command in ("add", "compact"):
+        recommender = FoodBuddyRecommender(args.root)
+        index = DeltaIndex(args.path, recommender.encode_recipes, recommender.vectorizer_version)
+    else:
+        index = DeltaIndex(args.path)
+
+    if args.command == "add":
+        print(f"Added {index.add(read_recipes(args.file))} recipes", file=sys.stderr)
+    elif args.command == "remove":
+        print(f"Removed {index.remove(args.names)} recipes", file=sys.stderr)
+    if args.command == "compact":
+        print(json.dumps(index.compact(), indent=2))
+    else:
+        print(json.dumps(index.status(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
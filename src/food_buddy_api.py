@@ -1,102 +1,589 @@
-import sys
 import os
+import sys
+import hashlib
+import time
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 import importlib.util
 import numpy as np
-import pandas as pd
+from scipy.sparse import vstack as sp_vstack
+from recipe_store import RecipeStore, hash_names
+from query_cache import QueryCache
+from delta_index import DeltaIndex
+from ingredient_corrector import IngredientCorrector
+from config import (
+    SHARED_ARTIFACTS_DIR, SHARED_ARTIFACTS_CHECK_SECONDS, DELTA_RECIPES_PATH, INGREDIENT_CORRECTION_ENABLED,
+)
 
 # Path configuration
 BASE_PARENT = Path(__file__).resolve().parent.parent.parent
-ML_BUDDY_PATH = BASE_PARENT / "ml-food-buddy-recommender"
-ML_BUDDY_SRC_PATH = ML_BUDDY_PATH / "src"
-RECOMMENDER_PATH = ML_BUDDY_SRC_PATH / "recommender.py"
-UTILS_PATH = ML_BUDDY_SRC_PATH / "utils.py"
-CONFIG_PATH = ML_BUDDY_SRC_PATH / "config.py"
-
-if not all(p.exists() for p in [RECOMMENDER_PATH, UTILS_PATH, CONFIG_PATH]):
-    raise FileNotFoundError("Cannot find required ML buddy modules")
-
-# Store original state
-original_cwd = os.getcwd()
-original_path = sys.path.copy()
-
-def load_ml_buddy_modules():
-    """Load ML buddy modules in isolation"""
-    # Clear conflicting modules and change to project directory
-    modules_to_remove = [k for k in sys.modules.keys() if k.startswith('src.')]
-    for module in modules_to_remove:
-        del sys.modules[module]
-    
-    os.chdir(ML_BUDDY_PATH)
-    
-    # Preserve standard library and essential paths
-    stdlib_paths = [p for p in sys.path if 'site-packages' not in p and 'lib/python' in p]
-    site_packages = [p for p in sys.path if 'site-packages' in p]
-    
-    sys.path.clear()
-    # Add our paths first, then standard library, then site-packages
-    sys.path.extend([str(ML_BUDDY_PATH), str(ML_BUDDY_SRC_PATH)])
-    sys.path.extend(stdlib_paths)
-    sys.path.extend(site_packages)
-    
-    # Load modules in correct order
-    for name, path in [("src.utils", UTILS_PATH), ("src.config", CONFIG_PATH), ("recommender", RECOMMENDER_PATH)]:
-        spec = importlib.util.spec_from_file_location(name, path)
-        module = importlib.util.module_from_spec(spec)
-        sys.modules[name] = module
-        spec.loader.exec_module(module)
-    
-    # Load artifacts and return everything needed
-    recommender = sys.modules["recommender"]
-    df, vectorizer, vectors = recommender.load_artifacts()
-    return recommender, df, vectorizer, vectors
-
-try:
-    recommender, df, vectorizer, vectors = load_ml_buddy_modules()
-finally:
-    # Restore original environment
-    os.chdir(original_cwd)
-    sys.path.clear()
-    sys.path.extend(original_path)
+ML_BUDDY_PATH = Path(os.getenv("ML_BUDDY_PATH", BASE_PARENT / "ml-food-buddy-recommender"))
+
+RETURN_COLUMNS = [
+    "Name", "Image_first", "TotalTime_str",
+    "recipe_instructions_clean", "ingredients_clean", "Calories", "similarity"
+]
+
+# Preference buckets as half-open (low, high] ranges. The cutoffs are this
+# project's own (the ML Food Buddy artifacts do not define any): TotalTime in
+# minutes, Calories in kcal per recipe.
+TIME_PREF_MINUTES = {"fast": (0, 30), "medium": (30, 60), "long": (60, np.inf)}
+CALORIE_PREF_RANGES = {"low": (0, 400), "medium": (400, 700), "high": (700, np.inf)}
+
+# Blocking for batched scoring: queries per block x recipe rows per block; only one
+# block of scores (and its running top-k) is held at a time
+QUERY_BLOCK_SIZE = 32
+VECTOR_BLOCK_SIZE = 65536
+
+# Initial candidates fetched per requested result; doubled until enough unique names
+OVERFETCH = 4
+
+# sys.path / sys.modules are process-wide, so isolated imports are serialized
+_IMPORT_LOCK = threading.Lock()
+
+
+def _is_ml_buddy_module(name):
+    return name == "recommender" or name.startswith("src.")
+
+
+@contextmanager
+def ml_buddy_import_context(root: Path):
+    """
+    Temporarily expose the ML buddy modules for importing and unpickling,
+    then restore sys.path and any conflicting modules. Only used while loading.
+    """
+    with _IMPORT_LOCK:
+        original_path = sys.path.copy()
+        original_modules = {k: v for k, v in sys.modules.items() if _is_ml_buddy_module(k)}
+        for name in original_modules:
+            del sys.modules[name]
+
+        src_path = root / "src"
+        sys.path[:0] = [str(root), str(src_path)]
+
+        try:
+            # Load modules in correct order
+            for name, file_name in [("src.utils", "utils.py"), ("src.config", "config.py"), ("recommender", "recommender.py")]:
+                spec = importlib.util.spec_from_file_location(name, src_path / file_name)
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[name] = module
+                spec.loader.exec_module(module)
+            yield sys.modules["recommender"]
+        finally:
+            sys.path.clear()
+            sys.path.extend(original_path)
+            for name in [k for k in sys.modules if _is_ml_buddy_module(k)]:
+                del sys.modules[name]
+            sys.modules.update(original_modules)
+
+
+class SortedColumnIndex:
+    """Row ids ordered by a numeric column, for O(log n) range lookups."""
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=float)
+        # NaNs sort last, so they never fall inside a finite range
+        self.order = np.argsort(values, kind="stable")
+        self.sorted_values = values[self.order]
+
+    def range(self, low, high):
+        """Row ids with low < value <= high, in ascending row order."""
+        start = np.searchsorted(self.sorted_values, low, side="right")
+        stop = np.searchsorted(self.sorted_values, high, side="right")
+        return np.sort(self.order[start:stop])
+
+
+class FoodBuddyRecommender:
+    """
+    Thread-safe handle on the ML buddy recommender. All paths are resolved at
+    construction; artifacts load lazily on first use (recipe vectors are
+    memory-mapped read-only) and queries never touch cwd, sys.path or sys.modules.
+    When a current RecipeStore exists (see recipe_store.py) recipe metadata is
+    read from it and the DataFrame is never loaded. Recipes added since the
+    artifacts were built live in a DeltaIndex (see delta_index.py) and are
+    scored alongside them.
+    """
+
+    def __init__(self, root: Path = ML_BUDDY_PATH, delta_path=DELTA_RECIPES_PATH):
+        self.root = Path(root).resolve()
+        self.module_paths = [self.root / "src" / f for f in ("recommender.py", "utils.py", "config.py")]
+        self.vectorizer_path = self.root / "models" / "tfidf_vectorizer.pkl"
+        self.vectors_path = self.root / "models" / "recipe_vectors.npy"
+        self.recipes_path = self.root / "data" / "preprocessed" / "final_recipes.csv.gzip"
+        self.store_path = self.root / "models" / "recipe_store"
+        self.ingredient_index_path = self.root / "models" / "ingredient_index.json"
+        self.delta_path = Path(delta_path)
+
+        self._lock = threading.Lock()
+        self._vectorizer = None
+        self._vectors = None
+        self._df = None
+        self._store = None
+        self._store_checked = False
+        self._names = None
+        self._filter_indexes = None
+        self._artifact_version = None
+        self._vectorizer_version = None
+        self._delta = None
+        self._corrector = None
+        self.query_cache = QueryCache()
+
+    @property
+    def artifact_version(self) -> str:
+        """Stamp of the artifact files (size + mtime) taken when first needed."""
+        if self._artifact_version is None:
+            paths = [self.vectorizer_path, self.vectors_path, self.recipes_path, self.store_path / "meta.json",
+                     self.ingredient_index_path]
+            stamps = [f"{p}:{p.stat().st_size}:{p.stat().st_mtime_ns}" for p in paths if p.exists()]
+            self._artifact_version = hashlib.sha256("|".join(stamps).encode("utf-8")).hexdigest()[:16]
+        return self._artifact_version
+
+    @property
+    def vectorizer_version(self) -> str:
+        """Digest of the vectorizer file's content, so copies of it share delta vectors."""
+        if self._vectorizer_version is None:
+            digest = hashlib.sha256()
+            with open(self.vectorizer_path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+            self._vectorizer_version = digest.hexdigest()[:16]
+        return self._vectorizer_version
+
+    def _load_vectorizer(self):
+        if not all(p.exists() for p in self.module_paths):
+            raise FileNotFoundError("Cannot find required ML buddy modules")
+
+        import joblib
+        with ml_buddy_import_context(self.root):
+            # The vectorizer may reference ML buddy helpers, so unpickle it in context
+            return joblib.load(self.vectorizer_path)
+
+    @property
+    def vectorizer(self):
+        if self._vectorizer is None:
+            with self._lock:
+                if self._vectorizer is None:
+                    self._vectorizer = self._load_vectorizer()
+        return self._vectorizer
+
+    @property
+    def vectors(self):
+        if self._vectors is None:
+            with self._lock:
+                if self._vectors is None:
+                    self._vectors = np.load(self.vectors_path, mmap_mode="r")
+        return self._vectors
+
+    @property
+    def df(self):
+        if self._df is None:
+            with self._lock:
+                if self._df is None:
+                    import pandas as pd
+                    self._df = pd.read_csv(self.recipes_path, compression="gzip")
+        return self._df
+
+    @property
+    def store(self):
+        """Memory-mapped RecipeStore, or None when absent or older than the recipe table."""
+        if not self._store_checked:
+            with self._lock:
+                if not self._store_checked:
+                    self._store = RecipeStore.open_if_current(self.store_path, self.recipes_path)
+                    self._store_checked = True
+        return self._store
+
+    @property
+    def names(self):
+        """
+        Per-row uint64 name hashes, only compared for duplicates. Integers keep
+        np.unique working when a Name is missing (NaN among strings).
+        """
+        if self._names is None:
+            store = self.store
+            self._names = store.name_hashes if store is not None else hash_names(self.df["Name"])
+        return self._names
+
+    @property
+    def delta(self) -> DeltaIndex:
+        if self._delta is None:
+            vectorizer_version = self.vectorizer_version
+            with self._lock:
+                if self._delta is None:
+                    self._delta = DeltaIndex(self.delta_path, self.encode_recipes, vectorizer_version)
+        return self._delta
+
+    @property
+    def corrector(self) -> IngredientCorrector:
+        """Fuzzy ingredient corrector over the precomputed index (or the vectorizer vocabulary)."""
+        if self._corrector is None:
+            corrector = IngredientCorrector.for_vectorizer(self.vectorizer, self.ingredient_index_path, self.vectorizer_version)
+            with self._lock:
+                if self._corrector is None:
+                    self._corrector = corrector
+        return self._corrector
+
+    def encode_recipes(self, texts):
+        """Sparse TF-IDF rows for ingredient texts, in the dtype of the recipe vectors."""
+        return self.vectorizer.transform(list(texts)).astype(self.vectors.dtype).tocsr()
+
+    def _numeric(self, column):
+        store = self.store
+        return store.numeric(column) if store is not None else _numeric_column(self.df, column)
+
+    @property
+    def filter_indexes(self):
+        """Sorted indexes over TotalTime and Calories, built once per load."""
+        if self._filter_indexes is None:
+            columns = {column: self._numeric(column) for column in ("TotalTime", "Calories")}
+            with self._lock:
+                if self._filter_indexes is None:
+                    self._filter_indexes = {column: SortedColumnIndex(values) for column, values in columns.items()}
+        return self._filter_indexes
+
+    def _eligible_rows(self, time_pref=None, calorie_pref=None):
+        """Sorted row ids matching the preferences, or None when unconstrained."""
+        rows = None
+        for column, ranges, pref in [("TotalTime", TIME_PREF_MINUTES, time_pref), ("Calories", CALORIE_PREF_RANGES, calorie_pref)]:
+            if pref is None:
+                continue
+            column_rows = self.filter_indexes[column].range(*ranges[pref])
+            rows = column_rows if rows is None else np.intersect1d(rows, column_rows, assume_unique=True)
+        return rows
+
+    def _score_block(self, query_matrix, rows=None):
+        """Cosine scores of a block of queries against the recipe vectors
+        (all of them, or only `rows`).
+
+        TF-IDF rows are L2-normalized, so the dot product is the cosine similarity.
+        """
+        vectors = self.vectors
+        n_rows = vectors.shape[0] if rows is None else len(rows)
+        scores = np.empty((query_matrix.shape[0], n_rows), dtype=np.float32)
+        for start in range(0, n_rows, VECTOR_BLOCK_SIZE):
+            stop = min(start + VECTOR_BLOCK_SIZE, n_rows)
+            block = np.asarray(vectors[start:stop] if rows is None else vectors[rows[start:stop]])
+            scores[:, start:stop] = query_matrix @ block.T
+        return scores
+
+    def _block_top(self, query_matrix, k, rows=None):
+        """
+        Top `k` (positions, scores) per query row over all recipe vectors (or
+        only `rows`), merging a running top-k per row block so the full score
+        matrix is never materialized.
+        """
+        vectors = self.vectors
+        n_rows = vectors.shape[0] if rows is None else len(rows)
+        best_ids = np.empty((query_matrix.shape[0], 0), dtype=np.intp)
+        best_scores = np.empty((query_matrix.shape[0], 0), dtype=np.float32)
+        for start in range(0, n_rows, VECTOR_BLOCK_SIZE):
+            stop = min(start + VECTOR_BLOCK_SIZE, n_rows)
+            block = np.asarray(vectors[start:stop] if rows is None else vectors[rows[start:stop]])
+            scores = np.asarray(query_matrix @ block.T, dtype=np.float32)
+            top = _top_k(scores, k)
+            ids = np.concatenate([best_ids, top + start], axis=1)
+            merged = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+            order = _top_k(merged, k)
+            best_ids = np.take_along_axis(ids, order, axis=1)
+            best_scores = np.take_along_axis(merged, order, axis=1)
+        return best_ids, best_scores
+
+    def _unique_top(self, scores, names, top_n, candidates):
+        """
+        Best `top_n` positions in `scores` with distinct `names`. `candidates`
+        is the initial top-k; when duplicates leave fewer than `top_n` names,
+        k is doubled until enough unique names are found or the scores run out.
+        """
+        k = len(candidates)
+        while True:
+            ids = candidates[np.isfinite(scores[candidates])]
+            _, first = np.unique(names[ids], return_index=True)
+            ids = ids[np.sort(first)]
+            exhausted = k >= len(scores) or not np.isfinite(scores[candidates[-1]])
+            if len(ids) >= top_n or exhausted:
+                return ids[:top_n]
+            k = min(k * 2, len(scores))
+            candidates = _top_k(scores[None, :], k)[0]
+
+    def _records(self, row_ids, similarities, delta=None):
+        """
+        Materialize only the returned columns for the selected rows; ids past
+        the base vectors are positions in the `delta` segment.
+        """
+        columns = [c for c in RETURN_COLUMNS if c != "similarity"]
+        n_base = self.vectors.shape[0]
+        is_delta = row_ids >= n_base
+        if is_delta.any():
+            records = [None] * len(row_ids)
+            base = np.flatnonzero(~is_delta)
+            if len(base):
+                for position, record in zip(base, self._records(row_ids[base], similarities[base])):
+                    records[position] = record
+            for position in np.flatnonzero(is_delta):
+                record = delta.record(row_ids[position] - n_base, columns)
+                record["similarity"] = float(similarities[position])
+                records[position] = record
+            return records
+
+        store = self.store
+        if store is not None:
+            records = store.records(row_ids, columns)
+            for record, similarity in zip(records, similarities):
+                record["similarity"] = float(similarity) if np.isfinite(similarity) else None
+            return records
+
+        results = self.df.iloc[row_ids, self.df.columns.get_indexer(columns)].copy()
+        results["similarity"] = similarities
+        return _clean_results(results)
+
+    def _query_vectors(self, canonical_queries, queries):
+        """Sparse TF-IDF rows for canonical queries; only cache misses are vectorized."""
+        cache = self.query_cache.vectors
+        cached = [cache.get(key) for key in canonical_queries]
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        if missing:
+            fresh = self.vectorizer.transform([queries[i] for i in missing]).astype(self.vectors.dtype).tocsr()
+            for row, i in enumerate(missing):
+                cached[i] = fresh[row]
+                cache.put(canonical_queries[i], cached[i])
+        return sp_vstack(cached, format="csr")
+
+    def _search(self, query_vectors, top_n, rows):
+        """(row ids, similarities) of the top `top_n` distinct-name recipes per query row."""
+        names = self.names if rows is None else self.names[rows]
+        k = top_n * OVERFETCH
+
+        hits = []
+        for start in range(0, query_vectors.shape[0], QUERY_BLOCK_SIZE):
+            block = query_vectors[start:start + QUERY_BLOCK_SIZE]
+            top_ids, top_scores = self._block_top(block, k, rows)
+
+            for row in range(block.shape[0]):
+                _, first = np.unique(names[top_ids[row]], return_index=True)
+                keep = np.sort(first)[:top_n]
+                positions, similarities = top_ids[row, keep], top_scores[row, keep]
+                if len(keep) < top_n and k < len(names):
+                    # Duplicate names used up the candidates: score this query in full
+                    scores = self._score_block(block[row], rows)[0]
+                    positions = self._unique_top(scores, names, top_n, _top_k(scores[None, :], k * 2)[0])
+                    similarities = scores[positions]
+                ids = positions if rows is None else rows[positions]
+                hits.append((ids, similarities))
+        return hits
+
+    def _search_delta(self, query_vectors, top_n, delta, time_pref=None, calorie_pref=None):
+        """(delta positions, similarities) of the top `top_n` distinct-name delta recipes per query row."""
+        scores = (query_vectors @ delta.matrix.T).toarray()
+        for values, ranges, pref in [(delta.total_time, TIME_PREF_MINUTES, time_pref), (delta.calories, CALORIE_PREF_RANGES, calorie_pref)]:
+            if pref is not None:
+                low, high = ranges[pref]
+                scores[:, ~((values > low) & (values <= high))] = -np.inf
+
+        names = delta.name_hashes
+        hits = []
+        for row, candidates in enumerate(_top_k(scores, top_n * OVERFETCH)):
+            positions = self._unique_top(scores[row], names, top_n, candidates)
+            hits.append((positions, scores[row, positions]))
+        return hits
+
+    def _merge_hits(self, base, extra, delta, top_n):
+        """Best `top_n` distinct-name hits out of base and delta hits; delta ids are offset past the base rows."""
+        ids = np.concatenate([base[0], extra[0] + self.vectors.shape[0]])
+        similarities = np.concatenate([base[1], extra[1]])
+        names = np.concatenate([self.names[base[0]], delta.name_hashes[extra[0]]])
+        order = np.argsort(-similarities, kind="stable")
+        _, first = np.unique(names[order], return_index=True)
+        keep = order[np.sort(first)][:top_n]
+        return ids[keep], similarities[keep]
+
+    def recommend_batch(self, queries, top_n=3, time_pref=None, calorie_pref=None):
+        """
+        Recommend recipes for many queries at once. Queries are vectorized
+        together and scored in blocks with one sparse x dense product per block.
+        Misspelled ingredients are corrected first (INGREDIENT_CORRECTION_ENABLED).
+        Queries with the same canonical ingredient list share cached vectors and
+        top-k results. The delta segment is scored separately and its top-k
+        merged with the base one; cached results are keyed on its version.
+        Returns one list of result dicts per query, in input order.
+        """
+        for name, pref, ranges in [("time_pref", time_pref, TIME_PREF_MINUTES), ("calorie_pref", calorie_pref, CALORIE_PREF_RANGES)]:
+            if pref is not None and pref not in ranges:
+                raise ValueError(f"Unknown {name} {pref!r}; expected one of {', '.join(ranges)} or None")
+
+        queries = list(queries)
+        if not queries:
+            return []
+        if INGREDIENT_CORRECTION_ENABLED:
+            queries = self.corrector.correct_batch(queries)
+
+        cache = self.query_cache
+        cache.bind(self.vectorizer, self.artifact_version)
+        canonical = [cache.canonical(q) for q in queries]
+        delta = self.delta.segment()
+        result_keys = [(key, top_n, time_pref, calorie_pref, delta.version) for key in canonical]
+        hits = [cache.results.get(key) for key in result_keys]
+
+        # Score each distinct uncached query once
+        pending = {}
+        for i, hit in enumerate(hits):
+            if hit is None:
+                pending.setdefault(canonical[i], i)
+        if pending:
+            first = list(pending.values())
+            query_vectors = self._query_vectors([canonical[i] for i in first], [queries[i] for i in first])
+            # Constrained queries only score the eligible subset of vectors
+            rows = self._eligible_rows(time_pref, calorie_pref)
+            searched = self._search(query_vectors, top_n, rows)
+            if len(delta):
+                delta_hits = self._search_delta(query_vectors, top_n, delta, time_pref, calorie_pref)
+                searched = [self._merge_hits(base, extra, delta, top_n) for base, extra in zip(searched, delta_hits)]
+            computed = {}
+            for i, hit in zip(first, searched):
+                cache.results.put(result_keys[i], hit)
+                computed[canonical[i]] = hit
+            hits = [hit if hit is not None else computed[key] for hit, key in zip(hits, canonical)]
+
+        return [self._records(ids, similarities, delta) for ids, similarities in hits]
+
+    def load(self):
+        """Eagerly load every artifact (e.g. to warm up a worker)."""
+        self.vectorizer, self.vectors, self.names, self.filter_indexes
+        if self.store is not None:
+            self.store.map_all()
+        self.delta.segment()
+        if INGREDIENT_CORRECTION_ENABLED:
+            self.corrector
+        return self
+
+    def recommend(self, query, time_pref=None, calorie_pref=None, top_n=3):
+        """
+        Top `top_n` recipes with distinct names for one query. Selection is a
+        partial argpartition over the similarity vector, not a full sort.
+        """
+        return self.recommend_batch([query], top_n=top_n, time_pref=time_pref, calorie_pref=calorie_pref)[0]
+
+
+def _numeric_column(df, column):
+    """Column as float array; ISO 8601 durations (e.g. "PT45M") become minutes."""
+    import pandas as pd
+    values = df[column]
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=float)
+    return (pd.to_timedelta(values, errors="coerce").dt.total_seconds() / 60).to_numpy()
+
+
+def _top_k(scores, k):
+    """Indices of the k highest scores per row, best first."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.empty((scores.shape[0], 0), dtype=np.intp)
+    ids = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, ids, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(ids, order, axis=1)
+
+
+def _clean_results(results):
+    """Replace NaN/inf with None and cast numeric columns to plain floats."""
+    results_clean = results.replace({np.nan: None, np.inf: None, -np.inf: None})
 
-# Recommendation function
-def get_food_buddy_recommendations(query, time_pref=None, calorie_pref=None, top_n=3):
-    current_cwd = os.getcwd()
-    current_path = sys.path.copy()
-    
-    try:
-        os.chdir(ML_BUDDY_PATH)
-        sys.path.insert(0, str(ML_BUDDY_PATH))
-        
-        results = recommender.recommend(
-            user_prefs=query,
-            dataset=df,
-            recipe_vectors_matrix=vectors,
-            vectorizer=vectorizer,
-            top_n=top_n,
-            time_pref=time_pref,
-            calorie_pref=calorie_pref,
-            return_columns=[
-                "Name", "Image_first", "TotalTime_str",
-                "recipe_instructions_clean", "ingredients_clean", "Calories", "similarity"
-            ]
-        )
-    finally:
-        os.chdir(current_cwd)
-        sys.path.clear()
-        sys.path.extend(current_path)
-    
-    # Clean and return results
-    results_clean = (
-        results.drop_duplicates(subset=["Name"])
-        .head(top_n)
-        .replace({np.nan: None, np.inf: None, -np.inf: None})
-    )
-    
     for col in ["Calories", "similarity"]:
         if col in results_clean.columns:
             results_clean[col] = results_clean[col].apply(
                 lambda x: float(x) if x is not None else None
             )
-    
-    return results_clean.to_dict(orient="records")
\ No newline at end of file
+
+    return results_clean.to_dict(orient="records")
+
+
+def published_version(shared_dir):
+    """Version named by `<shared_dir>/CURRENT`, or None when nothing is published."""
+    try:
+        with open(Path(shared_dir) / "CURRENT", "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+class PublishedRecommender:
+    """
+    Recommender attached to the artifacts published by shared_artifacts.py.
+    CURRENT is checked at most every `check_interval` seconds; a new version
+    is loaded in the background and swapped in once ready, while requests
+    keep using the previous one. If the version in use was already removed
+    (e.g. by a later publish), the new one is loaded before answering.
+    """
+
+    def __init__(self, shared_dir=SHARED_ARTIFACTS_DIR, check_interval: float = SHARED_ARTIFACTS_CHECK_SECONDS):
+        self.shared_dir = Path(shared_dir)
+        self.check_interval = check_interval
+        self.version = None
+        self._recommender = None
+        self._checked = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def _attach(self, version):
+        return FoodBuddyRecommender(self.shared_dir / version).load()
+
+    def _refresh(self, version):
+        try:
+            recommender = self._attach(version)
+            with self._lock:
+                self._recommender, self.version = recommender, version
+        finally:
+            self._refreshing = False
+
+    def current(self) -> FoodBuddyRecommender:
+        now = time.monotonic()
+        if self._recommender is not None and now - self._checked < self.check_interval:
+            return self._recommender
+
+        with self._lock:
+            self._checked = now
+            version = published_version(self.shared_dir)
+            stale = self._recommender is not None and not (self.shared_dir / self.version).exists()
+            if self._recommender is None or (stale and version is not None):
+                if version is None:
+                    raise FileNotFoundError(f"No recommender artifacts published in {self.shared_dir}")
+                self._recommender, self.version = self._attach(version), version
+            elif version is not None and version != self.version and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._refresh, args=(version,), name="artifact-refresh", daemon=True).start()
+            return self._recommender
+
+    def load(self):
+        self.current()
+        return self
+
+    def recommend_batch(self, queries, top_n=3, time_pref=None, calorie_pref=None):
+        return self.current().recommend_batch(queries, top_n=top_n, time_pref=time_pref, calorie_pref=calorie_pref)
+
+    def recommend(self, query, time_pref=None, calorie_pref=None, top_n=3):
+        return self.current().recommend(query, time_pref=time_pref, calorie_pref=calorie_pref, top_n=top_n)
+
+
+_default_recommender = None
+_default_lock = threading.Lock()
+
+
+def get_recommender():
+    """
+    Process-wide recommender shared by every caller: attached to the published
+    artifacts when SHARED_ARTIFACTS_DIR is set, otherwise loaded from ML_BUDDY_PATH.
+    """
+    global _default_recommender
+    if _default_recommender is None:
+        with _default_lock:
+            if _default_recommender is None:
+                _default_recommender = PublishedRecommender() if SHARED_ARTIFACTS_DIR else FoodBuddyRecommender()
+    return _default_recommender
+
+
+# Recommendation function
+def get_food_buddy_recommendations(query, time_pref=None, calorie_pref=None, top_n=3):
+    return get_recommender().recommend(query, time_pref=time_pref, calorie_pref=calorie_pref, top_n=top_n)
+
+
+def get_food_buddy_recommendations_batch(queries, top_n=3, time_pref=None, calorie_pref=None):
+    return get_recommender().recommend_batch(queries, top_n=top_n, time_pref=time_pref, calorie_pref=calorie_pref)
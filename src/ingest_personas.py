@@ -0,0 +1,146 @@
+"""
+Build personas for many chef videos at once.
+
+    python src/ingest_personas.py VIDEO_ID [VIDEO_ID ...]
+    python src/ingest_personas.py --file video_ids.txt --fetch-workers 16 --llm-workers 4
+    python src/ingest_personas.py --file video_ids.txt --fixtures-dir tests/transcripts   # offline
+
+Videos whose persona already exists for the model are skipped. Transcripts
+are fetched on a bounded thread pool; each video moves on to cleaning and
+persona generation as soon as its transcript arrives, with at most
+`--llm-workers` videos in the LLM stages (chunk cleaning inside each is
+further bounded by CLEAN_MAX_CONCURRENCY and the shared rate limiter).
+Per-stage timings come from the tracing spans of the pipeline.
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import tracing
+from artifact_cache import artifact_key, valid_video_id
+from chef_rag import ChefInferno
+from chef_service import resolve_raw_transcript, resolve_persona
+from persona_store import get_persona_store
+from config import DEFAULT_MODEL, INGEST_FETCH_WORKERS, INGEST_LLM_WORKERS
+
+# Span name -> stage reported in the summary
+STAGES = {
+    "ingest.fetch": "fetch",
+    "ingest.build": "build",  # clean + persona, end to end
+    "stage.clean_transcript": "clean",
+    "chef.persona": "persona",
+    "openai.chat": "llm_calls",
+}
+
+
+def read_video_ids(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.split("#", 1)[0].strip() for line in f if line.split("#", 1)[0].strip()]
+
+
+def _fetch(video_id: str, fixtures_dir) -> dict:
+    with tracing.span("ingest.fetch", video_id=video_id) as span:
+        try:
+            resolve_raw_transcript(video_id, fixtures_dir)
+            return {"video_id": video_id}
+        except Exception as e:
+            span.fail(e)
+            return {"video_id": video_id, "error": f"Failed to fetch transcript: {str(e)}"}
+
+
+def _build_persona(video_id: str, model: str) -> dict:
+    with tracing.span("ingest.build", video_id=video_id, model=model) as span:
+        result = resolve_persona(ChefInferno(model=model), video_id, model)
+        if "error" in result:
+            span.fail(result["error"])
+    return {"video_id": video_id, "seconds": round(span.duration_ms / 1000, 2), **result}
+
+
+def ingest(video_ids, model: str = None, fetch_workers: int = INGEST_FETCH_WORKERS,
+           llm_workers: int = INGEST_LLM_WORKERS, fixtures_dir=None) -> dict:
+    """Create missing personas for `video_ids`; returns counts, failures and per-stage timings."""
+    model = model or DEFAULT_MODEL
+    store = get_persona_store()
+    video_ids = list(dict.fromkeys(video_ids))
+    failures = {v: f"Invalid YouTube video id {v!r}" for v in video_ids if not valid_video_id(v)}
+    todo = [v for v in video_ids if v not in failures and artifact_key(v, model) not in store]
+    skipped = len(video_ids) - len(failures) - len(todo)
+    print(f"{len(video_ids)} videos, {skipped} already have personas, {len(todo)} to build", file=sys.stderr)
+    for video_id, error in failures.items():
+        print(f"✗ {video_id}: {error}", file=sys.stderr)
+
+    timings = tracing.add_sink(tracing.HistogramSink())
+    started = time.perf_counter()
+    created = 0
+    try:
+        with ThreadPoolExecutor(max_workers=fetch_workers) as fetch_pool, \
+                ThreadPoolExecutor(max_workers=llm_workers) as llm_pool:
+            fetches = [fetch_pool.submit(tracing.wrap(_fetch), v, fixtures_dir) for v in todo]
+            builds = []
+            for future in as_completed(fetches):
+                fetched = future.result()
+                if "error" in fetched:
+                    failures[fetched["video_id"]] = fetched["error"]
+                    print(f"✗ {fetched['video_id']}: {fetched['error']}", file=sys.stderr)
+                    continue
+                builds.append(llm_pool.submit(tracing.wrap(_build_persona), fetched["video_id"], model))
+
+            for future in as_completed(builds):
+                built = future.result()
+                if "error" in built:
+                    failures[built["video_id"]] = built["error"]
+                    print(f"✗ {built['video_id']}: {built['error']}", file=sys.stderr)
+                else:
+                    created += 1
+                    print(f"✓ {built['video_id']} ({built['seconds']}s) [{created}/{len(todo)}]", file=sys.stderr)
+    finally:
+        tracing.remove_sink(timings)
+
+    elapsed = time.perf_counter() - started
+    summary = timings.summary()
+    return {
+        "videos": len(video_ids),
+        "skipped": skipped,
+        "created": created,
+        "failed": len(failures),
+        "failures": failures,
+        "seconds": round(elapsed, 2),
+        "personas_per_minute": round(created / elapsed * 60, 1) if elapsed else 0.0,
+        "stages": {
+            stage: {
+                "count": summary[name]["count"],
+                "total_s": round(summary[name]["mean_ms"] * summary[name]["count"] / 1000, 2),
+                "p50_ms": round(summary[name]["p50_ms"], 1),
+                "p95_ms": round(summary[name]["p95_ms"], 1),
+                **({"prompt_tokens": int(summary[name]["prompt_tokens"]),
+                    "completion_tokens": int(summary[name]["completion_tokens"]),
+                    "cost_usd": round(summary[name]["cost_usd"], 4)} if name == "openai.chat" else {}),
+            }
+            for name, stage in STAGES.items() if name in summary
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build chef personas for many videos")
+    parser.add_argument("video_ids", nargs="*", help="YouTube video ids")
+    parser.add_argument("--file", help="File with one video id per line (# comments allowed)")
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--fetch-workers", type=int, default=INGEST_FETCH_WORKERS, help="Concurrent transcript fetches")
+    parser.add_argument("--llm-workers", type=int, default=INGEST_LLM_WORKERS, help="Videos cleaned/summarized at once")
+    parser.add_argument("--fixtures-dir", default=None, help="Read {video_id}.txt transcripts here instead of YouTube")
+    args = parser.parse_args()
+
+    video_ids = list(args.video_ids) + (read_video_ids(args.file) if args.file else [])
+    if not video_ids:
+        parser.error("Give video ids or --file")
+
+    summary = ingest(video_ids, args.model, args.fetch_workers, args.llm_workers, args.fixtures_dir)
+    print(json.dumps(summary, indent=2))
+    if summary["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
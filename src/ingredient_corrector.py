@@ -0,0 +1,189 @@
+"""
+Fuzzy correction of misspelled ingredients before queries are vectorized.
+
+    python src/ingredient_corrector.py build                 # from ML_BUDDY_PATH
+    python src/ingredient_corrector.py check "parmesean tomatoe pasta"
+
+Words the vectorizer does not know ("parmesean", "tomatoe") would otherwise
+drop out of the TF-IDF vector. `build` precomputes the ingredient index: the
+vectorizer terms that occur in the recipes' `ingredients_clean`, with the
+number of recipes using each, saved next to the other artifacts. Without it
+the vectorizer vocabulary is used on its own, ranked by IDF. Unknown words of
+a batch of queries are matched together with one rapidfuzz `process.cdist`
+per first letter, ties going to the more common ingredient; words with no
+close match there (a typo in the first letter: "pomato") get one more cdist
+against every candidate. Every correction is kept in a small LRU cache.
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+import numpy as np
+from rapidfuzz import fuzz, process
+from lru import LRUCache
+from query_utils import QUERY_STOP_WORDS
+from singleflight import atomic_write
+from config import INGREDIENT_CORRECTION_CUTOFF, INGREDIENT_CORRECTION_CACHE
+
+WORD_RE = re.compile(r"[a-z]+", re.IGNORECASE)
+# Shorter words are too ambiguous to correct ("bean" vs "beef")
+MIN_WORD_LENGTH = 4
+BUILD_BLOCK_ROWS = 50000
+
+
+class IngredientCorrector:
+    """
+    Replaces out-of-vocabulary words with the closest ingredient term.
+    `terms` maps each candidate to how common it is (higher wins ties);
+    `known` is the full vectorizer vocabulary (default: the candidates), and
+    words in it are never changed. `analyzer` is the vectorizer's, so words
+    it already maps to known tokens (or drops, like stop words) are left alone.
+    """
+
+    def __init__(self, terms: dict, analyzer=None, known=None, score_cutoff: float = INGREDIENT_CORRECTION_CUTOFF,
+                 max_entries: int = INGREDIENT_CORRECTION_CACHE):
+        self.known = set(known) if known is not None else set(terms)
+        self.analyzer = analyzer
+        self.score_cutoff = score_cutoff
+        self.cache = LRUCache(max_entries)
+
+        # Candidates most common first so argmax prefers them on ties, also grouped by first letter
+        self._candidates = [term for term in sorted(terms, key=lambda t: (-terms[t], t))
+                            if len(term) >= MIN_WORD_LENGTH - 1 and term.isalpha()]
+        self._buckets = {}
+        for term in self._candidates:
+            self._buckets.setdefault(term[0], []).append(term)
+
+    def _closest(self, words, choices) -> list:
+        """Closest of `choices` for each word, or None when none reaches the cutoff."""
+        if not choices:
+            return [None] * len(words)
+        scores = process.cdist(words, choices, scorer=fuzz.ratio, score_cutoff=self.score_cutoff, dtype=np.uint8)
+        best = scores.argmax(axis=1)
+        return [choices[b] if scores[row, b] else None for row, b in enumerate(best)]
+
+    def _needs_correction(self, word: str) -> bool:
+        if len(word) < MIN_WORD_LENGTH or word in self.known or word in QUERY_STOP_WORDS:
+            return False
+        if self.analyzer is None:
+            return True
+        return any(token not in self.known for token in self.analyzer(word))
+
+    def correct_words(self, words) -> dict:
+        """Correction for each word that needs one (a word maps to itself when nothing is close)."""
+        corrections = {}
+        pending = {}
+        for word in set(words):
+            cached = self.cache.get(word)
+            if cached is not None:
+                corrections[word] = cached
+            elif self._needs_correction(word):
+                pending.setdefault(word[0], []).append(word)
+
+        found = {}
+        for letter, group in pending.items():
+            found.update(zip(group, self._closest(group, self._buckets.get(letter))))
+        unmatched = [word for word, fixed in found.items() if fixed is None]
+        if unmatched:
+            found.update(zip(unmatched, self._closest(unmatched, self._candidates)))
+
+        for word, fixed in found.items():
+            fixed = fixed or word
+            self.cache.put(word, fixed)
+            corrections[word] = fixed
+        return corrections
+
+    def correct_batch(self, queries) -> list:
+        """`queries` with misspelled ingredients replaced; everything else is left as is."""
+        queries = list(queries)
+        words = [word for query in queries for word in WORD_RE.findall(query.lower())
+                 if len(word) >= MIN_WORD_LENGTH and word not in self.known]
+        if not words:
+            return queries
+        corrections = self.correct_words(words)
+
+        def replace(match):
+            word = match.group(0).lower()
+            fixed = corrections.get(word, word)
+            return match.group(0) if fixed == word else fixed
+
+        return [WORD_RE.sub(replace, query) for query in queries]
+
+    def correct(self, query: str) -> str:
+        return self.correct_batch([query])[0]
+
+    @classmethod
+    def for_vectorizer(cls, vectorizer, index_path=None, vectorizer_version: str = None, **kwargs):
+        """
+        Corrector whose candidates come from the index built for this vectorizer
+        at `index_path`, or from the vectorizer vocabulary (common = low IDF)
+        when there is none. Every vocabulary word counts as known either way.
+        """
+        vocabulary = getattr(vectorizer, "vocabulary_", {})
+        terms = None
+        if index_path is not None and Path(index_path).exists():
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("vectorizer") == vectorizer_version:
+                terms = index["terms"]
+        if terms is None:
+            idf = getattr(vectorizer, "idf_", None)
+            terms = {term: -float(idf[column]) if idf is not None else 0.0 for term, column in vocabulary.items()}
+        build_analyzer = getattr(vectorizer, "build_analyzer", None)
+        analyzer = build_analyzer() if build_analyzer is not None else None
+        return cls(terms, analyzer=analyzer, known=vocabulary or None, **kwargs)
+
+
+def build_index(recommender, out_path=None) -> Path:
+    """Count the recipes whose ingredients_clean contains each vectorizer term; writes the index JSON."""
+    import pandas as pd
+
+    vectorizer = recommender.vectorizer
+    terms = vectorizer.get_feature_names_out()
+    counts = np.zeros(len(terms), dtype=np.int64)
+    rows = 0
+    for chunk in pd.read_csv(recommender.recipes_path, compression="gzip", usecols=["ingredients_clean"],
+                             chunksize=BUILD_BLOCK_ROWS):
+        matrix = vectorizer.transform(chunk["ingredients_clean"].fillna("").astype(str))
+        counts += np.bincount(matrix.indices, minlength=len(terms))
+        rows += len(chunk)
+
+    out_path = Path(out_path or recommender.ingredient_index_path)
+    atomic_write(out_path, json.dumps({
+        "vectorizer": recommender.vectorizer_version,
+        "recipes": rows,
+        "terms": {str(term): int(count) for term, count in zip(terms, counts) if count},
+    }))
+    return out_path
+
+
+def main():
+    from food_buddy_api import ML_BUDDY_PATH, FoodBuddyRecommender
+
+    parser = argparse.ArgumentParser(description="Fuzzy ingredient correction")
+    parser.add_argument("--root", default=ML_BUDDY_PATH, help="ML Food Buddy project directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="Precompute the ingredient index from ingredients_clean")
+    build_parser.add_argument("--out", default=None, help="Index file (default: <root>/models/ingredient_index.json)")
+    check_parser = sub.add_parser("check", help="Show how queries are corrected")
+    check_parser.add_argument("queries", nargs="+")
+    args = parser.parse_args()
+
+    recommender = FoodBuddyRecommender(args.root)
+    if args.command == "build":
+        print(build_index(recommender, args.out))
+        return
+
+    corrector = recommender.corrector
+    started = time.perf_counter()
+    corrected = corrector.correct_batch(args.queries)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for query, fixed in zip(args.queries, corrected):
+        print(f"{query!r} -> {fixed!r}")
+    print(f"{elapsed_ms:.3f} ms for {len(args.queries)} queries", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
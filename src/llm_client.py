@@ -0,0 +1,212 @@
+import asyncio
+import random
+import threading
+import time
+import weakref
+import httpx
+import tracing
+from openai import (
+    OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient,
+    RateLimitError, APIConnectionError, APITimeoutError, InternalServerError,
+)
+from config import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    OPENAI_MAX_CONNECTIONS,
+    OPENAI_RPM_LIMIT,
+    OPENAI_TPM_LIMIT,
+    OPENAI_MAX_RETRIES,
+    MODEL_PRICES,
+)
+
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+BACKOFF_BASE = 0.5  # Seconds before the first retry
+BACKOFF_MAX = 30.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `rate_per_minute`.
+    Callers reserve capacity up front and are told how long to wait, so the
+    same bucket serves threads (time.sleep) and coroutines (asyncio.sleep).
+    A rate of 0 or less means unlimited.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.unlimited = rate_per_minute <= 0
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` tokens (possibly going into debt); return seconds to wait."""
+        if self.unlimited:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= min(amount, self.capacity)
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self, amount: float):
+        """Give back tokens that were reserved but not used."""
+        if self.unlimited:
+            return
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits shared by every caller (0 = unlimited)."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    def reserve(self, tokens: int) -> float:
+        return max(self.requests.reserve(1), self.tokens.reserve(tokens))
+
+    def settle(self, reserved: int, used: int):
+        """Correct the token bucket once the real usage is known."""
+        if used < reserved:
+            self.tokens.refund(reserved - used)
+
+
+def estimate_tokens(messages: list, max_tokens: int = 0) -> int:
+    """Rough upper bound of prompt + completion tokens (~4 characters per token)."""
+    prompt_chars = sum(len(m.get("content") or "") for m in messages)
+    return prompt_chars // 4 + len(messages) * 4 + (max_tokens or 0)
+
+
+rate_limiter = RateLimiter(OPENAI_RPM_LIMIT, OPENAI_TPM_LIMIT)
+
+_client = None
+_client_lock = threading.Lock()
+# AsyncOpenAI pools are bound to the event loop that created them
+_async_clients = weakref.WeakKeyDictionary()
+
+_POOL_LIMITS = httpx.Limits(
+    max_connections=OPENAI_MAX_CONNECTIONS,
+    max_keepalive_connections=OPENAI_MAX_CONNECTIONS,
+)
+
+
+def get_client() -> OpenAI:
+    """Process-wide OpenAI client with a keep-alive connection pool."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OpenAI(
+                    api_key=OPENAI_API_KEY,
+                    base_url=OPENAI_BASE_URL,
+                    max_retries=0,  # Retries are handled by chat_completion
+                    http_client=DefaultHttpxClient(limits=_POOL_LIMITS),
+                )
+    return _client
+
+
+def get_async_client() -> AsyncOpenAI:
+    """AsyncOpenAI client shared by everything running on the current event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            base_url=OPENAI_BASE_URL,
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(limits=_POOL_LIMITS),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Server-provided Retry-After if present, otherwise jittered exponential backoff."""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+def _used_tokens(response, reserved: int) -> int:
+    usage = getattr(response, "usage", None)
+    return usage.total_tokens if usage is not None else reserved
+
+
+def completion_cost(model: str, prompt_tokens: int, completion_tokens: int):
+    """USD cost from MODEL_PRICES (longest matching model prefix), or None for unknown models."""
+    matches = [name for name in MODEL_PRICES if (model or "").startswith(name)]
+    if not matches:
+        return None
+    prompt_price, completion_price = MODEL_PRICES[max(matches, key=len)]
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1e6
+
+
+def _record_usage(span, model: str, response):
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return  # Streams report usage only at the end; callers record it there
+    span.set(
+        prompt_tokens=usage.prompt_tokens,
+        completion_tokens=usage.completion_tokens,
+        cost_usd=completion_cost(model, usage.prompt_tokens, usage.completion_tokens),
+    )
+
+
+def chat_completion(**kwargs):
+    """
+    chat.completions.create on the shared client, throttled by the shared
+    rate limiter and retried with jittered exponential backoff on 429s,
+    timeouts, connection and server errors. Other errors propagate.
+    Each call is traced as an "openai.chat" span.
+    """
+    reserved = estimate_tokens(kwargs.get("messages", []), kwargs.get("max_tokens"))
+    with tracing.span("openai.chat", model=kwargs.get("model"), stream=bool(kwargs.get("stream"))) as span:
+        throttled = 0.0
+        for attempt in range(OPENAI_MAX_RETRIES + 1):
+            wait = rate_limiter.reserve(reserved)
+            throttled += wait
+            time.sleep(wait)
+            try:
+                response = get_client().chat.completions.create(**kwargs)
+            except RETRYABLE_ERRORS as e:
+                # A failed attempt used no tokens; the next one reserves them again
+                rate_limiter.settle(reserved, 0)
+                if attempt == OPENAI_MAX_RETRIES:
+                    raise
+                time.sleep(_retry_delay(e, attempt))
+                continue
+            rate_limiter.settle(reserved, _used_tokens(response, reserved))
+            span.set(retries=attempt, throttled_ms=throttled * 1000)
+            _record_usage(span, kwargs.get("model"), response)
+            return response
+
+
+async def chat_completion_async(**kwargs):
+    """Async version of chat_completion on the shared AsyncOpenAI client."""
+    reserved = estimate_tokens(kwargs.get("messages", []), kwargs.get("max_tokens"))
+    with tracing.span("openai.chat", model=kwargs.get("model"), stream=bool(kwargs.get("stream"))) as span:
+        throttled = 0.0
+        for attempt in range(OPENAI_MAX_RETRIES + 1):
+            wait = rate_limiter.reserve(reserved)
+            throttled += wait
+            await asyncio.sleep(wait)
+            try:
+                response = await get_async_client().chat.completions.create(**kwargs)
+            except RETRYABLE_ERRORS as e:
+                # A failed attempt used no tokens; the next one reserves them again
+                rate_limiter.settle(reserved, 0)
+                if attempt == OPENAI_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(_retry_delay(e, attempt))
+                continue
+            rate_limiter.settle(reserved, _used_tokens(response, reserved))
+            span.set(retries=attempt, throttled_ms=throttled * 1000)
+            _record_usage(span, kwargs.get("model"), response)
+            return response
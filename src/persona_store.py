@@ -0,0 +1,147 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from lru import LRUCache
+from artifact_cache import artifact_key, check_key
+from config import PERSONAS_DIR, PERSONA_STORE_PATH, PERSONA_CACHE_ENTRIES, DEFAULT_MODEL
+
+
+class PersonaStore:
+    """
+    Indexed persona repository: one SQLite file holding every persona with
+    its metadata (video_id, model, created_at, content hash), behind a bounded
+    in-memory LRU so hot personas are served without any file I/O.
+    Legacy `{persona_id}_persona.txt` files are imported on first lookup, as
+    are `{video_id}_persona.txt` files written before personas were keyed per
+    model (taken to belong to `legacy_model`). Persona ids are artifact keys
+    (ValueError otherwise). Misses are remembered too, until this store writes
+    the persona or another connection commits to the database.
+    """
+
+    def __init__(self, path=PERSONA_STORE_PATH, memory_entries: int = PERSONA_CACHE_ENTRIES,
+                 legacy_dir=PERSONAS_DIR, legacy_model: str = DEFAULT_MODEL):
+        self.path = str(path)
+        self.legacy_dir = legacy_dir
+        self.legacy_model = legacy_model
+        self.memory = LRUCache(memory_entries)
+        self.missing = LRUCache(memory_entries)
+        self._missing_version = None
+        self._writes = 0
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS personas ("
+                "persona_id TEXT PRIMARY KEY, video_id TEXT, model TEXT, "
+                "created_at REAL NOT NULL, content_hash TEXT NOT NULL, persona TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS personas_video ON personas (video_id, model)")
+
+    def _load_legacy(self, persona_id: str):
+        candidates = [(persona_id, None, None)]
+        video_id = persona_id.rsplit("_", 1)[0]
+        if self.legacy_model and artifact_key(video_id, self.legacy_model) == persona_id:
+            candidates.append((video_id, video_id, self.legacy_model))
+
+        for legacy_id, video_id, model in candidates:
+            path = os.path.join(self.legacy_dir, f"{legacy_id}_persona.txt")
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    persona_text = f.read()
+                return self.put(persona_id, persona_text, video_id=video_id, model=model)
+        return None
+
+    def _check_missing(self):
+        # data_version changes whenever another connection (or process) commits
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._missing_version:
+            self.missing.clear()
+            self._missing_version = version
+
+    def get_record(self, persona_id: str):
+        """Persona with its metadata as a dict, or None."""
+        check_key(persona_id)
+        record = self.memory.get(persona_id)
+        if record is not None:
+            return record
+
+        with self._lock:
+            self._check_missing()
+            if self.missing.get(persona_id):
+                return None
+            writes = self._writes
+            row = self._conn.execute("SELECT * FROM personas WHERE persona_id = ?", (persona_id,)).fetchone()
+        if row is None:
+            record = self._load_legacy(persona_id)
+            if record is None:
+                with self._lock:
+                    if writes == self._writes:  # Not written since the lookup
+                        self.missing.put(persona_id, True)
+            return record
+
+        record = dict(row)
+        self.memory.put(persona_id, record)
+        return record
+
+    def get(self, persona_id: str):
+        """Persona text, or None."""
+        record = self.get_record(persona_id)
+        return record["persona"] if record else None
+
+    def put(self, persona_id: str, persona_text: str, video_id: str = None, model: str = None) -> dict:
+        check_key(persona_id)
+        record = {
+            "persona_id": persona_id,
+            "video_id": video_id,
+            "model": model,
+            "created_at": time.time(),
+            "content_hash": hashlib.sha256(persona_text.encode("utf-8")).hexdigest(),
+            "persona": persona_text,
+        }
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO personas (persona_id, video_id, model, created_at, content_hash, persona) "
+                "VALUES (:persona_id, :video_id, :model, :created_at, :content_hash, :persona)",
+                record
+            )
+            self._writes += 1
+            self.missing.pop(persona_id)
+        self.memory.put(persona_id, record)
+        return record
+
+    def delete(self, persona_id: str):
+        check_key(persona_id)
+        self.memory.pop(persona_id)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM personas WHERE persona_id = ?", (persona_id,))
+
+    def list(self) -> list:
+        """Metadata of every stored persona (without the persona text)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT persona_id, video_id, model, created_at, content_hash FROM personas ORDER BY created_at"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def __contains__(self, persona_id: str) -> bool:
+        return self.get_record(persona_id) is not None
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_persona_store() -> PersonaStore:
+    """Process-wide persona store at PERSONA_STORE_PATH."""
+    global _default_store
+    if _default_store is None:
+        with _default_lock:
+            if _default_store is None:
+                _default_store = PersonaStore()
+    return _default_store
@@ -0,0 +1,66 @@
+from dataclasses import dataclass, field
+from tokens import count_tokens, split_sentences, split_words
+from config import DEFAULT_MODEL, PROMPT_BUDGETS, MODEL_PROMPT_BUDGETS
+
+
+def prompt_budgets(kind: str, model: str = None) -> dict:
+    """Section token budgets for a prompt kind, with per-model overrides applied."""
+    budgets = dict(PROMPT_BUDGETS[kind])
+    budgets.update(MODEL_PROMPT_BUDGETS.get(model or DEFAULT_MODEL, {}).get(kind, {}))
+    return budgets
+
+
+def trim_to_tokens(text: str, max_tokens: int, model: str = None) -> str:
+    """
+    Keep as many whole sentences as fit in max_tokens; a first sentence that
+    alone is too long is cut on a word boundary. Trimmed text ends in "...".
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return text
+
+    budget = max_tokens - 1  # Room for the ellipsis
+    kept, used = [], 0
+    for sentence in split_sentences(text):
+        n = count_tokens(sentence, model) + (1 if kept else 0)
+        if used + n > budget:
+            if not kept:
+                piece = split_words(sentence, budget, model)[0]
+                if count_tokens(piece, model) > budget:
+                    piece = piece[:budget * 4]  # A single over-long word
+                kept.append(piece)
+            break
+        kept.append(sentence)
+        used += n
+    return " ".join(kept) + "..."
+
+
+@dataclass
+class Prompt:
+    messages: list
+    section_tokens: dict = field(default_factory=dict)
+    total_tokens: int = 0
+
+
+class PromptBuilder:
+    """
+    Packs prompt sections into their token budgets and reports how many
+    tokens each section and the assembled prompt use.
+
+        builder = PromptBuilder("critique", model)
+        ingredients = builder.section("ingredients", ingredients)
+        prompt = builder.build(messages)
+    """
+
+    def __init__(self, kind: str, model: str = None):
+        self.model = model or DEFAULT_MODEL
+        self.budgets = prompt_budgets(kind, self.model)
+        self.section_tokens = {}
+
+    def section(self, name: str, text: str) -> str:
+        text = trim_to_tokens(str(text), self.budgets[name], self.model)
+        self.section_tokens[name] = count_tokens(text, self.model)
+        return text
+
+    def build(self, messages: list) -> Prompt:
+        total = sum(count_tokens(m["content"], self.model) for m in messages)
+        return Prompt(messages=messages, section_tokens=dict(self.section_tokens), total_tokens=total)
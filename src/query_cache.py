@@ -0,0 +1,50 @@
+import threading
+from lru import LRUCache
+from query_utils import canonical_ingredients
+from config import QUERY_CACHE_ENTRIES
+
+
+class QueryCache:
+    """
+    Recommendation caches keyed on the canonical ingredient list: sparse
+    query vectors (skips vectorization) and top-k (row ids, similarities)
+    per preference combination (skips scoring). Both are tied to an
+    artifact version and are cleared when the loaded artifacts change.
+    """
+
+    def __init__(self, max_entries: int = QUERY_CACHE_ENTRIES):
+        self.vectors = LRUCache(max_entries)
+        self.results = LRUCache(max_entries)
+        self.version = None
+        self._analyzer = None
+        self._vocabulary = None
+        self._ordered = False
+        self._lock = threading.Lock()
+
+    def bind(self, vectorizer, version):
+        """Use `vectorizer` for canonical forms; drop every entry if `version` changed."""
+        if version == self.version:
+            return
+        with self._lock:
+            if version == self.version:
+                return
+            self.vectors.clear()
+            self.results.clear()
+            # Word unigrams only depend on token counts, so order and unknown tokens can go
+            build_analyzer = getattr(vectorizer, "build_analyzer", None)
+            self._analyzer = build_analyzer() if build_analyzer is not None else None
+            self._ordered = (
+                self._analyzer is None
+                or getattr(vectorizer, "analyzer", "word") != "word"
+                or tuple(getattr(vectorizer, "ngram_range", (1, 1))) != (1, 1)
+            )
+            self._vocabulary = getattr(vectorizer, "vocabulary_", None)
+            self.version = version
+
+    def canonical(self, query: str) -> str:
+        if self._analyzer is None:
+            return query  # Unknown vectorizer: only identical strings share entries
+        return canonical_ingredients(query, self._analyzer, self._vocabulary, ordered=self._ordered)
+
+    def stats(self) -> dict:
+        return {"version": self.version, "vectors": self.vectors.stats(), "results": self.results.stats()}
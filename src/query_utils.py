@@ -0,0 +1,30 @@
+import re
+
+# Filler words that do not change which ingredients were asked for
+QUERY_STOP_WORDS = {"a", "an", "and", "of", "or", "some", "the", "with"}
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of an ingredient query: lowercased words without
+    punctuation or filler words, deduplicated and sorted, so that
+    "Garlic, chicken" and "chicken and garlic" normalize to "chicken garlic".
+    """
+    words = re.findall(r"[a-z0-9]+", query.lower())
+    return " ".join(sorted({w for w in words if w not in QUERY_STOP_WORDS}))
+
+
+def canonical_ingredients(query: str, analyzer=None, vocabulary=None, ordered: bool = False) -> str:
+    """
+    Canonical form of a query for a given vectorizer: the tokens its
+    `analyzer` produces, restricted to `vocabulary` and sorted (repeats are
+    kept, since they change term frequency). Two queries with the same
+    canonical form get the same TF-IDF vector. Pass ordered=True when token
+    order matters (e.g. n-gram analyzers); then nothing is dropped or sorted.
+    """
+    tokens = analyzer(query) if analyzer is not None else re.findall(r"[a-z0-9]+", query.lower())
+    if ordered:
+        return " ".join(tokens)
+    if vocabulary is not None:
+        tokens = [t for t in tokens if t in vocabulary]
+    return " ".join(sorted(tokens))
@@ -0,0 +1,186 @@
+"""
+Columnar, offset-indexed copy of the ML Food Buddy recipe table.
+
+    python src/recipe_store.py convert                 # from ML_BUDDY_PATH
+    python src/recipe_store.py convert --root /path/to/ml-food-buddy-recommender
+
+Layout (one directory, every array memory-mapped read-only on load):
+    meta.json                 row count, columns and the source file stamp
+    <text col>.offsets.npy    int64 byte offsets (rows + 1) into <text col>.data.bin
+    <text col>.data.bin       UTF-8 values back to back
+    <text col>.valid.npy      bool, False where the source value was missing
+    <numeric col>.npy         float64 (NaN where missing)
+    name_hash.npy             uint64 hash of Name, for duplicate-name checks
+Only the rows and columns that are actually returned get decoded.
+"""
+import argparse
+import json
+import os
+import threading
+from pathlib import Path
+import numpy as np
+from singleflight import atomic_write
+
+STORE_VERSION = 1
+TEXT_COLUMNS = ["Name", "Image_first", "TotalTime_str", "recipe_instructions_clean", "ingredients_clean"]
+NUMERIC_COLUMNS = ["TotalTime", "Calories"]
+WRITE_BLOCK_ROWS = 50000
+
+
+def source_stamp(path) -> dict:
+    """Size and mtime of the source table, used to detect a stale store."""
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def hash_names(names):
+    """uint64 hash per recipe name (a missing name hashes like "nan"), for duplicate checks."""
+    import pandas as pd
+    return pd.util.hash_array(pd.Series(names, dtype=object).astype(str).to_numpy(dtype=object))
+
+
+def _write_text_column(out_dir: Path, column: str, values):
+    valid = values.notna().to_numpy()
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    with open(out_dir / f"{column}.data.bin", "wb") as f:
+        for start in range(0, len(values), WRITE_BLOCK_ROWS):
+            block = [str(v).encode("utf-8") if ok else b""
+                     for v, ok in zip(values.iloc[start:start + WRITE_BLOCK_ROWS], valid[start:start + WRITE_BLOCK_ROWS])]
+            offsets[start + 1:start + 1 + len(block)] = offsets[start] + np.cumsum([len(b) for b in block])
+            f.write(b"".join(block))
+    np.save(out_dir / f"{column}.offsets.npy", offsets)
+    np.save(out_dir / f"{column}.valid.npy", valid)
+
+
+def write_store(df, out_dir, source=None) -> Path:
+    """Write `df` (the preprocessed recipe table) as a RecipeStore directory."""
+    from food_buddy_api import _numeric_column
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # Readers only trust a directory with meta.json; drop it while rewriting
+    (out_dir / "meta.json").unlink(missing_ok=True)
+
+    for column in TEXT_COLUMNS:
+        _write_text_column(out_dir, column, df[column])
+    for column in NUMERIC_COLUMNS:
+        np.save(out_dir / f"{column}.npy", _numeric_column(df, column).astype(np.float64))
+    np.save(out_dir / "name_hash.npy", hash_names(df["Name"]))
+
+    meta = {
+        "version": STORE_VERSION,
+        "rows": len(df),
+        "text_columns": TEXT_COLUMNS,
+        "numeric_columns": NUMERIC_COLUMNS,
+        "source": source_stamp(source) if source else None,
+    }
+    atomic_write(out_dir / "meta.json", json.dumps(meta, indent=2))
+    return out_dir
+
+
+def convert(recipes_path, out_dir) -> Path:
+    """Build a store next to the models from the gzipped recipe CSV."""
+    import pandas as pd
+    df = pd.read_csv(recipes_path, compression="gzip")
+    return write_store(df, out_dir, source=recipes_path)
+
+
+def _load_array(path: Path):
+    # np.memmap refuses empty files
+    if path.suffix == ".bin":
+        return np.memmap(path, dtype=np.uint8, mode="r") if path.stat().st_size else np.empty(0, dtype=np.uint8)
+    return np.load(path, mmap_mode="r")
+
+
+class RecipeStore:
+    """Read-only, memory-mapped view of a store written by write_store."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / "meta.json", "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported recipe store version {self.meta.get('version')} in {self.path}")
+        self.rows = self.meta["rows"]
+        self._arrays = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open_if_current(cls, path, source=None):
+        """
+        Store at `path`, or None when there is none or it was built from a
+        different version of `source` (a missing source is fine: the store
+        can ship on its own).
+        """
+        path = Path(path)
+        if not (path / "meta.json").exists():
+            return None
+        store = cls(path)
+        if source is not None and os.path.exists(source) and store.meta.get("source") != source_stamp(source):
+            return None
+        return store
+
+    def _array(self, file_name: str):
+        array = self._arrays.get(file_name)
+        if array is None:
+            with self._lock:
+                array = self._arrays.get(file_name)
+                if array is None:
+                    array = self._arrays[file_name] = _load_array(self.path / file_name)
+        return array
+
+    def map_all(self):
+        """Memory-map every column now, so the store keeps working if its directory is removed."""
+        for column in self.meta["text_columns"]:
+            for suffix in (".valid.npy", ".offsets.npy", ".data.bin"):
+                self._array(column + suffix)
+        for column in self.meta["numeric_columns"]:
+            self._array(f"{column}.npy")
+        self._array("name_hash.npy")
+        return self
+
+    def numeric(self, column: str):
+        return self._array(f"{column}.npy")
+
+    @property
+    def name_hashes(self):
+        return self._array("name_hash.npy")
+
+    def text(self, column: str, row: int):
+        if not self._array(f"{column}.valid.npy")[row]:
+            return None
+        offsets = self._array(f"{column}.offsets.npy")
+        return self._array(f"{column}.data.bin")[offsets[row]:offsets[row + 1]].tobytes().decode("utf-8")
+
+    def records(self, row_ids, columns) -> list:
+        """Dicts of `columns` for `row_ids`; missing or non-finite values become None."""
+        records = []
+        for row in np.asarray(row_ids, dtype=np.int64):
+            record = {}
+            for column in columns:
+                if column in self.meta["numeric_columns"]:
+                    value = float(self.numeric(column)[row])
+                    record[column] = value if np.isfinite(value) else None
+                else:
+                    record[column] = self.text(column, row)
+            records.append(record)
+        return records
+
+
+def main():
+    from food_buddy_api import ML_BUDDY_PATH, FoodBuddyRecommender
+
+    parser = argparse.ArgumentParser(description="Columnar recipe store for the ML Food Buddy table")
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert_parser = sub.add_parser("convert", help="Build the store from final_recipes.csv.gzip")
+    convert_parser.add_argument("--root", default=ML_BUDDY_PATH, help="ML Food Buddy project directory")
+    convert_parser.add_argument("--out", default=None, help="Store directory (default: <root>/models/recipe_store)")
+    args = parser.parse_args()
+
+    recommender = FoodBuddyRecommender(args.root)
+    out_dir = convert(recommender.recipes_path, args.out or recommender.store_path)
+    print(out_dir)
+
+
+if __name__ == "__main__":
+    main()
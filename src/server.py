@@ -0,0 +1,248 @@
+"""
+Headless HTTP API around generate_chef_response.
+
+    python src/server.py --port 8000 --workers 8 --queue-size 64
+
+    POST /v1/chef-response          {"video_id": "...", "query": "...", "model": "..."} -> JSON
+    POST /v1/chef-response/stream   same body -> server-sent events
+    GET  /healthz                   liveness
+    GET  /readyz                    200 once warm-up finished, 503 before
+    GET  /stats                     queue depth and trace summary
+
+Connections are handed to a fixed pool of worker threads through a bounded
+queue; when the queue is full the server answers 503 immediately instead of
+piling up work. Client sockets time out after SERVER_SOCKET_TIMEOUT, so a
+stalled client cannot hold a worker. The recommender, OpenAI client and persona store are
+process-wide singletons, warmed up in the background at start-up.
+"""
+import argparse
+import json
+import queue
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+import tracing
+from artifact_cache import valid_video_id
+from chef_service import generate_chef_response, generate_chef_response_stream
+from warmup import WarmUp
+from config import SERVER_HOST, SERVER_PORT, SERVER_WORKERS, SERVER_QUEUE_SIZE, SERVER_SOCKET_TIMEOUT
+
+MAX_BODY_BYTES = 64 * 1024
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer whose accepted connections are queued for `workers` threads.
+    A full queue is answered with 503 + Retry-After from the accept loop,
+    without ever blocking on the client.
+    """
+
+    def __init__(self, address, handler, workers: int = SERVER_WORKERS, queue_size: int = SERVER_QUEUE_SIZE,
+                 warmup: WarmUp = None):
+        super().__init__(address, handler)
+        self.warmup = warmup or WarmUp()
+        self.pending = queue.Queue(maxsize=queue_size)
+        self.rejected = 0
+        self.active = 0
+        self._active_lock = threading.Lock()
+        self.workers = [threading.Thread(target=self._work, name=f"worker-{i}", daemon=True) for i in range(workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def process_request(self, request, client_address):
+        try:
+            self.pending.put_nowait((request, client_address))
+        except queue.Full:
+            self.rejected += 1
+            self._reject(request)
+
+    def _reject(self, request):
+        body = json.dumps({"error": "Server busy, retry later"}).encode("utf-8")
+        try:
+            # Fits in the socket buffer; a client that cannot take it just loses the reply
+            request.setblocking(False)
+            request.send(
+                b"HTTP/1.0 503 Service Unavailable\r\n"
+                b"Content-Type: application/json\r\nRetry-After: 1\r\n"
+                + f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body
+            )
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)
+
+    def _work(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            request, client_address = item
+            with self._active_lock:
+                self.active += 1
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                with self._active_lock:
+                    self.active -= 1
+
+    def server_close(self):
+        super().server_close()
+        for _ in self.workers:
+            self.pending.put(None)
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self.workers),
+            "active": self.active,
+            "queued": self.pending.qsize(),
+            "queue_size": self.pending.maxsize,
+            "rejected": self.rejected,
+        }
+
+
+class ChefRequestHandler(BaseHTTPRequestHandler):
+    server_version = "ChefInferno/1.0"
+    timeout = SERVER_SOCKET_TIMEOUT  # Applied to the connection by StreamRequestHandler.setup
+
+    def log_message(self, format, *args):
+        pass  # Requests are traced instead
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_request(self):
+        """Parsed {video_id, query, model} body, or None after sending a 4xx."""
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send_json(400, {"error": "Invalid Content-Length"})
+            return None
+        if length > MAX_BODY_BYTES:
+            self._send_json(413, {"error": f"Body larger than {MAX_BODY_BYTES} bytes"})
+            return None
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": "Body must be JSON"})
+            return None
+        if not isinstance(body, dict) or not body.get("video_id") or not body.get("query"):
+            self._send_json(400, {"error": "Both 'video_id' and 'query' are required"})
+            return None
+        if not valid_video_id(body["video_id"]):
+            self._send_json(400, {"error": "'video_id' must be an 11-character YouTube video id"})
+            return None
+        if not self.server.warmup.ready:
+            self._send_json(503, {"error": "Warming up", **self.server.warmup.report()})
+            return None
+        return body
+
+    def do_GET(self):
+        if self.path == "/healthz":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/readyz":
+            report = self.server.warmup.report()
+            self._send_json(200 if report["ready"] else 503, report)
+        elif self.path == "/stats":
+            self._send_json(200, {"server": self.server.stats(), "trace": tracing.summary()})
+        else:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path == "/v1/chef-response":
+            self._respond()
+        elif self.path == "/v1/chef-response/stream":
+            self._respond_stream()
+        else:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def _internal_error(self, e: Exception) -> str:
+        self.server.handle_error(self.request, self.client_address)  # Prints the traceback
+        return f"Internal error: {str(e)}"
+
+    def _respond(self):
+        body = self._read_request()
+        if body is None:
+            return
+        try:
+            result = generate_chef_response(body["video_id"], body["query"], model=body.get("model"))
+        except Exception as e:
+            self._send_json(500, {"error": self._internal_error(e)})
+            return
+        self._send_json(422 if "error" in result else 200, result)
+
+    def _send_event(self, event: str, data):
+        self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _respond_stream(self):
+        body = self._read_request()
+        if body is None:
+            return
+        try:
+            result = generate_chef_response_stream(body["video_id"], body["query"], model=body.get("model"))
+        except Exception as e:
+            self._send_json(500, {"error": self._internal_error(e)})
+            return
+        if "error" in result:
+            self._send_json(422, result)
+            return
+
+        # HTTP/1.0: the stream ends when the connection closes
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self._send_event("persona", {"persona": result["persona"]})
+        try:
+            for chunk in result["critique_stream"]:
+                self._send_event("error" if chunk.startswith("❌") else "critique", {"text": chunk})
+            self._send_event("done", {})
+        except (BrokenPipeError, ConnectionResetError, TimeoutError):
+            result["critique_stream"].close()  # Client went away or stalled; stop the completion
+        except Exception as e:
+            # Headers are out, so the failure can only be reported in the stream
+            message = self._internal_error(e)
+            try:
+                self._send_event("error", {"text": f"❌ {message}"})
+            except OSError:
+                pass
+
+
+def serve(host: str = SERVER_HOST, port: int = SERVER_PORT, workers: int = SERVER_WORKERS,
+          queue_size: int = SERVER_QUEUE_SIZE, warm_video_ids=(), model: str = None) -> PooledHTTPServer:
+    """Bind the server and start warming up; call serve_forever() on the result."""
+    warmup = WarmUp(warm_video_ids, model).start()
+    return PooledHTTPServer((host, port), ChefRequestHandler, workers=workers, queue_size=queue_size, warmup=warmup)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chef Inferno HTTP API")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="Requests handled concurrently")
+    parser.add_argument("--queue-size", type=int, default=SERVER_QUEUE_SIZE, help="Waiting connections before 503s")
+    parser.add_argument("--warm-video", action="append", default=[], help="Preload this video's persona (repeatable)")
+    parser.add_argument("--model", default=None, help="Model used to look up warm-up personas")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.workers, args.queue_size, args.warm_video, args.model)
+    print(f"Chef Inferno API on http://{args.host}:{args.port} ({args.workers} workers)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
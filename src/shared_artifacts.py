@@ -0,0 +1,103 @@
+"""
+Publish recommender artifacts once per host for every worker to share.
+
+    python src/shared_artifacts.py publish --dir /dev/shm/chef-inferno
+    python src/shared_artifacts.py status --dir /dev/shm/chef-inferno
+
+`publish` copies the vectorizer, recipe vectors and a RecipeStore (converted
+from the CSV if needed) into `<dir>/<version>/`, laid out like an ML Food
+Buddy project, then atomically points `<dir>/CURRENT` at it. Workers started
+with SHARED_ARTIFACTS_DIR memory-map that version read-only, so on tmpfs N
+workers share one copy of the data, and they switch to a newly published
+version in the background. Older versions are removed; workers still mapping
+them keep their pages until they switch.
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from food_buddy_api import ML_BUDDY_PATH, FoodBuddyRecommender, published_version
+from recipe_store import RecipeStore, convert
+from singleflight import FileLock, atomic_write
+from config import SHARED_ARTIFACTS_DIR
+
+CURRENT_FILE = "CURRENT"
+
+
+def _copy_store(store_path: Path, out_dir: Path):
+    out_dir.mkdir(parents=True)
+    for path in store_path.iterdir():
+        if path.name != "meta.json":
+            shutil.copyfile(path, out_dir / path.name)
+    # meta.json last: a store is only valid once it exists
+    shutil.copyfile(store_path / "meta.json", out_dir / "meta.json")
+
+
+def publish(root=ML_BUDDY_PATH, shared_dir=SHARED_ARTIFACTS_DIR, keep: int = 2) -> str:
+    """Publish the artifacts under `root`; returns the version now CURRENT."""
+    if not shared_dir:
+        raise ValueError("No shared directory given (set SHARED_ARTIFACTS_DIR or pass --dir)")
+    shared_dir = Path(shared_dir)
+    source = FoodBuddyRecommender(root)
+    version = source.artifact_version
+
+    with FileLock(shared_dir / ".publish.lock"):
+        target = shared_dir / version
+        if not target.exists():
+            staging = shared_dir / f".{version}.{os.getpid()}.tmp"
+            shutil.rmtree(staging, ignore_errors=True)
+            (staging / "src").mkdir(parents=True)
+            (staging / "models").mkdir()
+
+            # ML buddy modules are needed to unpickle the vectorizer
+            for module_path in source.module_paths:
+                shutil.copyfile(module_path, staging / "src" / module_path.name)
+            shutil.copyfile(source.vectorizer_path, staging / "models" / source.vectorizer_path.name)
+            shutil.copyfile(source.vectors_path, staging / "models" / source.vectors_path.name)
+            if source.ingredient_index_path.exists():
+                shutil.copyfile(source.ingredient_index_path, staging / "models" / source.ingredient_index_path.name)
+
+            store_dir = staging / "models" / source.store_path.name
+            if RecipeStore.open_if_current(source.store_path, source.recipes_path) is not None:
+                _copy_store(source.store_path, store_dir)
+            else:
+                convert(source.recipes_path, store_dir)
+
+            atomic_write(staging / "published.json", json.dumps({
+                "version": version, "source": str(source.root), "published_at": time.time(),
+            }, indent=2))
+            os.rename(staging, target)
+
+        atomic_write(shared_dir / CURRENT_FILE, version)
+
+        # Drop all but the newest `keep` versions (the current one always stays)
+        versions = sorted(
+            (p for p in shared_dir.iterdir() if p.is_dir() and not p.name.startswith(".")),
+            key=lambda p: p.stat().st_mtime, reverse=True,
+        )
+        for old in [p for p in versions if p.name != version][max(0, keep - 1):]:
+            shutil.rmtree(old, ignore_errors=True)
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Share recommender artifacts between worker processes")
+    sub = parser.add_subparsers(dest="command", required=True)
+    publish_parser = sub.add_parser("publish", help="Copy artifacts into the shared directory and make them current")
+    publish_parser.add_argument("--root", default=ML_BUDDY_PATH, help="ML Food Buddy project directory")
+    publish_parser.add_argument("--dir", default=SHARED_ARTIFACTS_DIR, help="Shared directory, e.g. /dev/shm/chef-inferno")
+    publish_parser.add_argument("--keep", type=int, default=2, help="Published versions to keep")
+    status_parser = sub.add_parser("status", help="Show the current published version")
+    status_parser.add_argument("--dir", default=SHARED_ARTIFACTS_DIR)
+    args = parser.parse_args()
+
+    if args.command == "publish":
+        print(publish(args.root, args.dir, args.keep))
+    else:
+        print(published_version(args.dir) or "nothing published")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import re
+from functools import lru_cache
+from config import DEFAULT_MODEL
+
+try:
+    import tiktoken
+except ImportError:  # Fall back to a character-based estimate
+    tiktoken = None
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    """tiktoken encoding for `model`, or None when tiktoken or its BPE files are unavailable."""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:  # BPE files are downloaded on first use and may be unreachable offline
+        return None
+
+
+def count_tokens(text: str, model: str = None) -> int:
+    """Number of tokens in `text` for `model` (~4 characters per token, rounded up, without tiktoken)."""
+    if not text:
+        return 0
+    encoding = _encoding(model or DEFAULT_MODEL)
+    if encoding is None:
+        return -(-len(text) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def split_sentences(text: str) -> list:
+    """Split on sentence-ending punctuation; unpunctuated text stays one piece."""
+    return [s for s in _SENTENCE_END.split(text.strip()) if s]
+
+
+def split_words(text: str, max_tokens: int, model: str = None) -> list:
+    """Split an over-long sentence on word boundaries into pieces of at most max_tokens."""
+    pieces, current, current_tokens = [], [], 0
+    for word in text.split():
+        n = count_tokens(" " + word, model)
+        if current and current_tokens + n > max_tokens:
+            pieces.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(word)
+        current_tokens += n
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_by_tokens(text: str, max_tokens: int, model: str = None) -> list:
+    """
+    Pack whole sentences into chunks of at most ~max_tokens, in order.
+    Sentences longer than the budget are split on word boundaries.
+    """
+    chunks, current, current_tokens = [], [], 0
+    for sentence in split_sentences(text):
+        n = count_tokens(sentence, model)
+        pieces = [sentence] if n <= max_tokens else split_words(sentence, max_tokens, model)
+        for piece in pieces:
+            n = n if len(pieces) == 1 else count_tokens(piece, model)
+            if current and current_tokens + n > max_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += n
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
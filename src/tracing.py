@@ -0,0 +1,294 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from config import TRACE_SINKS
+
+logger = logging.getLogger("chef_inferno.trace")
+
+# Registered sinks (replaced, never mutated, so readers need no lock);
+# tracing is a no-op while this is empty
+_sinks = []
+_sinks_lock = threading.Lock()
+_current = contextvars.ContextVar("chef_inferno_span", default=None)
+
+
+class Span:
+    """
+    One timed stage. Used as a context manager it becomes the parent of spans
+    opened inside it; work that outlives a block (such as a streamed
+    completion) can hold the span and call .end() itself.
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "duration_ms",
+                 "attributes", "error", "_start", "_token")
+
+    def __init__(self, name: str, parent=None, **attributes):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start_ns = time.time_ns()
+        self.duration_ms = None
+        self.attributes = attributes
+        self.error = None
+        self._start = time.perf_counter()
+        self._token = None
+        _emit("on_start", self)
+
+    @property
+    def end_ns(self) -> int:
+        return self.start_ns + int((self.duration_ms or 0) * 1e6)
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+        return self
+
+    def fail(self, error):
+        """Mark the span as failed (also used for "❌ ..." results that are returned, not raised)."""
+        self.error = str(error)
+        return self
+
+    def end(self):
+        if self.duration_ms is None:
+            self.duration_ms = (time.perf_counter() - self._start) * 1000
+            _emit("on_end", self)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "duration_ms": self.duration_ms,
+            "error": self.error,
+            **self.attributes,
+        }
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        if exc is not None:
+            self.fail(f"{exc_type.__name__}: {exc}")
+        self.end()
+        return False
+
+
+class _NoopSpan:
+    """Returned while tracing is disabled so instrumented code costs almost nothing."""
+
+    __slots__ = ()
+    attributes = {}
+
+    def set(self, **attributes):
+        return self
+
+    def fail(self, error):
+        return self
+
+    def end(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _emit(hook: str, span: Span):
+    for sink in _sinks:
+        method = getattr(sink, hook, None)
+        if method is None:
+            continue
+        try:
+            method(span)
+        except Exception:
+            # A broken sink must never break a request
+            logger.exception("Trace sink %r failed", sink)
+
+
+def span(name: str, **attributes):
+    """
+    Child span of the current one: `with span("stage.recommend", query=q) as s: ...`.
+    Without `with` the span is not made current and must be ended with .end().
+    """
+    if not _sinks:
+        return NOOP_SPAN
+    return Span(name, _current.get(), **attributes)
+
+
+def current_span():
+    return _current.get() or NOOP_SPAN
+
+
+def record(**attributes):
+    """Add attributes to the current span, if any."""
+    current_span().set(**attributes)
+
+
+def wrap(fn):
+    """
+    Run `fn` in the caller's tracing context from another thread (thread
+    pools and run_in_executor do not propagate contextvars on their own).
+    """
+    if not _sinks:
+        return fn
+    context = contextvars.copy_context()
+
+    def traced(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    return traced
+
+
+class JsonLogSink:
+    """One JSON line per finished span, on the "chef_inferno.trace" logger or a stream."""
+
+    def __init__(self, stream=None, level: int = logging.INFO):
+        self.stream = stream
+        self.level = level
+        self._lock = threading.Lock()
+
+    def on_end(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        if self.stream is None:
+            logger.log(self.level, line)
+            return
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+class HistogramSink:
+    """
+    In-process latency summary per span name: percentiles over the most recent
+    `window` spans plus running totals of errors, cache hits, tokens and cost.
+    """
+
+    TOTALS = ("prompt_tokens", "completion_tokens", "cost_usd")
+
+    def __init__(self, window: int = 10000):
+        self.window = window
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._durations = defaultdict(lambda: deque(maxlen=self.window))
+            self._counts = defaultdict(lambda: defaultdict(float))
+
+    def on_end(self, span: Span):
+        with self._lock:
+            self._durations[span.name].append(span.duration_ms)
+            counts = self._counts[span.name]
+            counts["count"] += 1
+            counts["errors"] += span.error is not None
+            counts["cache_hits"] += bool(span.attributes.get("cache_hit"))
+            for key in self.TOTALS:
+                counts[key] += span.attributes.get(key) or 0
+
+    def summary(self) -> dict:
+        """{span name: {count, errors, cache_hits, p50_ms, p95_ms, p99_ms, mean_ms, tokens, cost}}."""
+        with self._lock:
+            snapshot = {name: (sorted(d), dict(self._counts[name])) for name, d in self._durations.items()}
+
+        summary = {}
+        for name, (durations, counts) in snapshot.items():
+            def pct(q):
+                return durations[min(len(durations) - 1, int(q / 100 * len(durations)))]
+            summary[name] = {
+                **{key: int(counts.get(key, 0)) for key in ("count", "errors", "cache_hits")},
+                "p50_ms": pct(50),
+                "p95_ms": pct(95),
+                "p99_ms": pct(99),
+                "mean_ms": sum(durations) / len(durations),
+                **{key: counts.get(key, 0) for key in self.TOTALS},
+            }
+        return summary
+
+
+class OpenTelemetrySink:
+    """Re-emits spans through an OpenTelemetry tracer (needs opentelemetry-api plus an SDK/exporter)."""
+
+    def __init__(self, tracer=None):
+        try:
+            from opentelemetry import trace
+        except ImportError as e:
+            raise ImportError("OpenTelemetrySink requires the opentelemetry-api package") from e
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer("chef_inferno")
+        self._open = {}
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span):
+        with self._lock:
+            parent = self._open.get(span.parent_id)
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        otel_span = self.tracer.start_span(span.name, context=context, start_time=span.start_ns)
+        with self._lock:
+            self._open[span.span_id] = otel_span
+
+    def on_end(self, span: Span):
+        with self._lock:
+            otel_span = self._open.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        for key, value in span.attributes.items():
+            if isinstance(value, (bool, int, float, str)):
+                otel_span.set_attribute(key, value)
+        if span.error is not None:
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, span.error))
+        otel_span.end(end_time=span.end_ns)
+
+
+SINK_TYPES = {"json": JsonLogSink, "histogram": HistogramSink, "otel": OpenTelemetrySink}
+
+
+def add_sink(sink):
+    global _sinks
+    with _sinks_lock:
+        _sinks = _sinks + [sink]
+    return sink
+
+
+def remove_sink(sink):
+    global _sinks
+    with _sinks_lock:
+        _sinks = [s for s in _sinks if s is not sink]
+
+
+def clear_sinks():
+    global _sinks
+    with _sinks_lock:
+        _sinks = []
+
+
+def configure(names: str) -> list:
+    """Register sinks from a comma-separated list of SINK_TYPES names."""
+    sinks = []
+    for name in filter(None, (n.strip().lower() for n in names.split(","))):
+        if name not in SINK_TYPES:
+            raise ValueError(f"Unknown trace sink {name!r}; expected one of {', '.join(SINK_TYPES)}")
+        sinks.append(add_sink(SINK_TYPES[name]()))
+    return sinks
+
+
+def summary() -> dict:
+    """Summary of the first registered HistogramSink, or {} when there is none."""
+    for sink in _sinks:
+        if isinstance(sink, HistogramSink):
+            return sink.summary()
+    return {}
+
+
+configure(TRACE_SINKS)
@@ -1,55 +1,140 @@
 import os
-from openai import OpenAI
-from config import OPENAI_API_KEY, RAW_TRANSCRIPTS_DIR, PREPROCESSED_TRANSCRIPTS_DIR, DEFAULT_MODEL
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import tracing
+from llm_client import chat_completion, chat_completion_async
+from artifact_cache import ArtifactCache
+from singleflight import atomic_write
+from tokens import count_tokens, chunk_by_tokens
+from config import (
+    RAW_TRANSCRIPTS_DIR,
+    PREPROCESSED_TRANSCRIPTS_DIR,
+    DEFAULT_MODEL,
+    CLEAN_CHUNK_TOKENS,
+    CLEAN_MAX_CONCURRENCY,
+)
+
+# Cleaned chunks are cached individually so a retry only redoes failed chunks
+chunk_cache = ArtifactCache()
 
 def save_file(text, path):
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(text)
+    atomic_write(path, text)
 
 def load_file(path):
     with open(path, "r", encoding="utf-8") as f:
         return f.read()
 
-def clean_transcript_text(transcript_text: str, file_name: str, model: str = None) -> str:
+def _cleaning_messages(transcript_text: str) -> list:
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You are a transcript editor. Rewrite text into smooth, natural English prose "
+                "with correct punctuation, keeping the original tone and style. "
+                "Do not summarize or remove content."
+            )
+        },
+        {"role": "user", "content": transcript_text}
+    ]
+
+def _save_transcripts(transcript_text, cleaned_text, file_name, save_raw):
+    if save_raw:
+        raw_path = os.path.join(RAW_TRANSCRIPTS_DIR, f"{file_name}.txt")
+        save_file(transcript_text, raw_path)
+    if cleaned_text is not None:
+        preprocessed_path = os.path.join(PREPROCESSED_TRANSCRIPTS_DIR, f"{file_name}_clean.txt")
+        save_file(cleaned_text, preprocessed_path)
+
+def _chunk_id(chunk: str) -> str:
+    return hashlib.sha256(chunk.encode("utf-8")).hexdigest()[:16]
+
+def _chunk_request(chunk: str, model: str) -> dict:
+    # A rewrite is about as long as its input; leave headroom for punctuation
+    return {
+        "model": model,
+        "messages": _cleaning_messages(chunk),
+        "max_tokens": int(count_tokens(chunk, model) * 1.5) + 64,
+        "temperature": 0.5,
+    }
+
+def _clean_chunk(chunk: str, model: str) -> str:
+    with tracing.span("transcript.chunk", model=model) as span:
+        cached = chunk_cache.get("chunk", _chunk_id(chunk), model)
+        span.set(cache_hit=cached is not None)
+        if cached is not None:
+            return cached
+
+        response = chat_completion(**_chunk_request(chunk, model))
+        cleaned_chunk = response.choices[0].message.content.strip()
+        chunk_cache.put("chunk", _chunk_id(chunk), cleaned_chunk, model)
+        return cleaned_chunk
+
+async def _clean_chunk_async(chunk: str, model: str, semaphore: asyncio.Semaphore) -> str:
+    with tracing.span("transcript.chunk", model=model) as span:
+        cached = chunk_cache.get("chunk", _chunk_id(chunk), model)
+        span.set(cache_hit=cached is not None)
+        if cached is not None:
+            return cached
+
+        async with semaphore:
+            response = await chat_completion_async(**_chunk_request(chunk, model))
+        cleaned_chunk = response.choices[0].message.content.strip()
+        chunk_cache.put("chunk", _chunk_id(chunk), cleaned_chunk, model)
+        return cleaned_chunk
+
+def clean_transcript_text(transcript_text: str, file_name: str, model: str = None, save_raw: bool = True) -> str:
     """
     Rewrite transcript into natural, punctuated language and save to preprocessed folder.
+    The whole transcript is split into sentence-aligned, token-bounded chunks that are
+    cleaned concurrently (at most CLEAN_MAX_CONCURRENCY at a time) and joined in order.
+    Pass save_raw=False when the raw transcript is already stored (e.g. by the artifact cache).
     """
     model = model or DEFAULT_MODEL
-    client = OpenAI(api_key=OPENAI_API_KEY)
 
     # Save raw transcript
-    raw_path = os.path.join(RAW_TRANSCRIPTS_DIR, f"{file_name}.txt")
-    save_file(transcript_text, raw_path)
+    _save_transcripts(transcript_text, None, file_name, save_raw)
 
-    # Truncate for safety
-    if len(transcript_text) > 3000:
-        transcript_text = transcript_text[:3000] + "..."
+    chunks = chunk_by_tokens(transcript_text, CLEAN_CHUNK_TOKENS, model)
+    tracing.record(chunks=len(chunks))
 
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a transcript editor. Rewrite text into smooth, natural English prose "
-                        "with correct punctuation, keeping the original tone and style. "
-                        "Do not summarize or remove content."
-                    )
-                },
-                {"role": "user", "content": transcript_text}
-            ],
-            max_tokens=800,
-            temperature=0.5
-        )
-
-        cleaned_text = response.choices[0].message.content.strip()
+        clean_chunk = tracing.wrap(_clean_chunk)
+        with ThreadPoolExecutor(max_workers=max(1, min(CLEAN_MAX_CONCURRENCY, len(chunks)))) as pool:
+            cleaned_chunks = list(pool.map(lambda chunk: clean_chunk(chunk, model), chunks))
+
+        cleaned_text = "\n\n".join(cleaned_chunks)
 
         # Save preprocessed transcript
-        preprocessed_path = os.path.join(PREPROCESSED_TRANSCRIPTS_DIR, f"{file_name}_clean.txt")
-        save_file(cleaned_text, preprocessed_path)
+        _save_transcripts(transcript_text, cleaned_text, file_name, save_raw=False)
+
+        return cleaned_text
+
+    except Exception as e:
+        return f"❌ Transcript cleaning failed: {str(e)}"
+
+async def clean_transcript_text_async(transcript_text: str, file_name: str, model: str = None, save_raw: bool = True) -> str:
+    """
+    Async version of clean_transcript_text built on the shared AsyncOpenAI client.
+    """
+    model = model or DEFAULT_MODEL
+
+    # Save raw transcript
+    _save_transcripts(transcript_text, None, file_name, save_raw)
+
+    chunks = chunk_by_tokens(transcript_text, CLEAN_CHUNK_TOKENS, model)
+    tracing.record(chunks=len(chunks))
+    semaphore = asyncio.Semaphore(CLEAN_MAX_CONCURRENCY)
+
+    try:
+        cleaned_chunks = await asyncio.gather(*[_clean_chunk_async(chunk, model, semaphore) for chunk in chunks])
+
+        cleaned_text = "\n\n".join(cleaned_chunks)
+
+        # Save preprocessed transcript
+        _save_transcripts(transcript_text, cleaned_text, file_name, save_raw=False)
 
         return cleaned_text
 
     except Exception as e:
-        return f"❌ Transcript cleaning failed: {str(e)}"
\ No newline at end of file
+        return f"❌ Transcript cleaning failed: {str(e)}"
@@ -0,0 +1,84 @@
+import threading
+import time
+from config import DEFAULT_MODEL
+
+# Component -> human-readable label, in the order they are warmed up
+WARMUP_STEPS = {
+    "modules": "Pipeline modules",
+    "recommender": "Recipe recommender",
+    "openai_client": "OpenAI client",
+    "personas": "Chef personas",
+}
+
+
+class WarmUp:
+    """
+    Loads shared, process-wide state in a background thread and reports
+    per-component status. Heavy modules are only imported by the thread, so
+    importing this module stays cheap.
+    """
+
+    def __init__(self, video_ids=(), model: str = None):
+        self.video_ids = list(video_ids)
+        self.model = model or DEFAULT_MODEL
+        self.status = {name: "pending" for name in WARMUP_STEPS}
+        self.started = time.time()
+        self.finished = None
+        self._thread = threading.Thread(target=self._run, name="warm-up", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def wait(self, timeout: float = None) -> bool:
+        self._thread.join(timeout)
+        return self.ready
+
+    def _step(self, name, fn):
+        self.status[name] = "loading"
+        try:
+            fn()
+            self.status[name] = "ready"
+        except Exception as e:
+            self.status[name] = f"error: {e}"
+
+    @staticmethod
+    def _import_modules():
+        import chef_service  # noqa: F401  (openai, numpy, scipy, youtube_transcript_api, ...)
+
+    @staticmethod
+    def _load_recommender():
+        from food_buddy_api import get_recommender
+        get_recommender().load()
+
+    @staticmethod
+    def _load_client():
+        from llm_client import get_client
+        get_client()
+
+    def _load_personas(self):
+        # Pull already-generated personas into the store's LRU; nothing is generated here
+        from artifact_cache import artifact_key
+        from persona_store import get_persona_store
+        store = get_persona_store()
+        for video_id in self.video_ids:
+            store.get(artifact_key(video_id, self.model))
+
+    def _run(self):
+        self._step("modules", self._import_modules)
+        self._step("recommender", self._load_recommender)
+        self._step("openai_client", self._load_client)
+        self._step("personas", self._load_personas)
+        self.finished = time.time()
+
+    @property
+    def ready(self) -> bool:
+        # Every request needs the recommender; the other steps only save latency
+        return self.status["recommender"] == "ready" and self.finished is not None
+
+    def report(self) -> dict:
+        return {
+            "ready": self.ready,
+            "components": dict(self.status),
+            "warmup_seconds": round((self.finished or time.time()) - self.started, 3),
+        }
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# src/ modules import each other by bare name, as when run from src/
+sys.path[:0] = [str(ROOT / "src"), str(ROOT / "benchmarks")]
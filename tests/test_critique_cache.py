@@ -0,0 +1,40 @@
+"""CritiqueCache: both tiers, the TTL and the entry bound."""
+from critique_cache import CritiqueCache, critique_cache_key
+
+
+def test_round_trip_through_disk(tmp_path):
+    path = tmp_path / "critiques.sqlite"
+    key = critique_cache_key("persona", "Pasta", "gpt-4o-mini", "tomato, basil")
+    CritiqueCache(path).put(key, "Needs more garlic.")
+
+    cache = CritiqueCache(path)
+    assert cache.get(key) == "Needs more garlic."
+    assert cache.get(key) == "Needs more garlic."
+    assert (cache.disk_hits, cache.memory_hits, cache.misses) == (1, 1, 0)
+
+
+def test_key_ignores_query_formatting():
+    key = critique_cache_key("persona", "Pasta", "gpt-4o-mini", "basil, tomato")
+    assert key == critique_cache_key("persona", "Pasta", "gpt-4o-mini", " Tomato  basil ")
+    assert key != critique_cache_key("other persona", "Pasta", "gpt-4o-mini", "basil, tomato")
+
+
+def test_expired_entries_miss(tmp_path):
+    cache = CritiqueCache(tmp_path / "critiques.sqlite", ttl=0)
+    cache.put("key", "Stale.")
+    assert cache.get("key") is None
+    assert cache.misses == 1
+
+
+def test_evicts_least_recently_used(tmp_path):
+    path = tmp_path / "critiques.sqlite"
+    cache = CritiqueCache(path, max_entries=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert CritiqueCache(path).get("a") == "A"  # A disk hit marks the entry as used
+    cache.put("c", "C")
+
+    on_disk = CritiqueCache(path, max_entries=2)
+    assert on_disk.get("a") == "A"
+    assert on_disk.get("b") is None
+    assert on_disk.get("c") == "C"
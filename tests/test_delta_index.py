@@ -0,0 +1,68 @@
+"""DeltaIndex: adds, supersedes and removals through the log, unreadable lines and refresh back-off."""
+import time
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from delta_index import DeltaIndex
+
+VECTORIZER = TfidfVectorizer().fit(["chicken garlic onion", "tomato basil pasta", "salmon lemon dill"])
+
+
+def encode(texts):
+    return VECTORIZER.transform(list(texts)).tocsr()
+
+
+def make_index(tmp_path, **kwargs):
+    return DeltaIndex(tmp_path / "delta.jsonl", encode, "v1", **kwargs)
+
+
+def test_add_supersede_and_remove(tmp_path):
+    index = make_index(tmp_path)
+    index.add([
+        {"Name": "Garlic Chicken", "ingredients_clean": "chicken garlic", "Calories": "420"},
+        {"Name": "Pasta", "ingredients_clean": "tomato pasta"},
+    ])
+    index.add([{"Name": "Garlic Chicken", "ingredients_clean": "chicken garlic onion"}])
+    index.remove(["Pasta"])
+
+    segment = make_index(tmp_path).segment()
+    assert list(segment.names) == ["Garlic Chicken"]
+    assert segment.recipes[0]["ingredients_clean"] == "chicken garlic onion"
+    assert (segment.matrix != encode(["chicken garlic onion"])).nnz == 0
+    assert index.status()["superseded"] == 3
+
+
+def test_unreadable_lines_are_skipped_and_compacted_away(tmp_path):
+    index = make_index(tmp_path)
+    index.add([{"Name": "Pasta", "ingredients_clean": "tomato pasta"}])
+    with open(index.path, "ab") as f:
+        f.write(b'{"op": "add", "recipe": {"Name": "Broken"\n["not", "an", "entry"]\n\xff\xfe\n')
+    index.add([{"Name": "Salmon", "ingredients_clean": "salmon lemon"}])
+
+    assert list(make_index(tmp_path).segment().names) == ["Pasta", "Salmon"]
+    assert index.status()["corrupt"] == 3
+    assert index.compact()["after"] == {**index.status(), "recipes": 2, "lines": 2, "superseded": 0, "corrupt": 0}
+
+
+def test_failed_refreshes_back_off(tmp_path):
+    index = make_index(tmp_path, check_interval=0)
+    index.add([{"Name": "Pasta", "ingredients_clean": "tomato pasta"}])
+    assert len(index.segment()) == 1
+
+    index.encode = None  # Every rebuild now fails
+    index.vectorizer_version = "v2"
+    index.remove(["Nothing"])
+    index.segment()
+    deadline = time.monotonic() + 5
+    while index._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert index._failures == 1
+    assert index._retry_at > time.monotonic()
+    assert len(index.segment()) == 1  # The old segment keeps being served
+    assert not index._refreshing
+
+
+@pytest.mark.parametrize("record", [{"Name": "No ingredients"}, {"ingredients_clean": "salt"}])
+def test_add_requires_name_and_ingredients(tmp_path, record):
+    with pytest.raises(ValueError):
+        make_index(tmp_path).add([record])
@@ -0,0 +1,20 @@
+"""IngredientCorrector: which words get corrected, and to what."""
+from ingredient_corrector import IngredientCorrector
+
+TERMS = {"tomato": 50, "potato": 40, "parmesan": 30, "basil": 20, "garlic": 10, "chicken": 5}
+
+
+def test_corrects_misspelled_ingredients():
+    corrector = IngredientCorrector(TERMS)
+    assert corrector.correct("Parmesean tomatoe pasta") == "parmesan tomato pasta"
+
+
+def test_corrects_a_typo_in_the_first_letter():
+    corrector = IngredientCorrector(TERMS)
+    assert corrector.correct_words(["xhicken", "barlic"]) == {"xhicken": "chicken", "barlic": "garlic"}
+
+
+def test_leaves_known_short_and_unmatched_words_alone():
+    corrector = IngredientCorrector(TERMS, known=[*TERMS, "pasta"])
+    assert corrector.correct("pasta with zzzzqqq and tomatoe") == "pasta with zzzzqqq and tomato"
+    assert corrector.cache.get("zzzzqqq") == "zzzzqqq"
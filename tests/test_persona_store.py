@@ -0,0 +1,58 @@
+"""PersonaStore: SQLite round trip and import of legacy persona files."""
+from artifact_cache import artifact_key
+from persona_store import PersonaStore
+
+VIDEO_ID = "dQw4w9WgXcQ"
+MODEL = "gpt-4o-mini"
+
+
+def make_store(tmp_path, **kwargs):
+    return PersonaStore(tmp_path / "personas.sqlite", legacy_dir=tmp_path / "legacy", legacy_model=MODEL, **kwargs)
+
+
+def test_round_trip_through_disk(tmp_path):
+    persona_id = artifact_key(VIDEO_ID, MODEL)
+    record = make_store(tmp_path).put(persona_id, "A fiery chef.", video_id=VIDEO_ID, model=MODEL)
+
+    store = make_store(tmp_path)
+    assert store.get_record(persona_id) == record
+    assert store.get(persona_id) == "A fiery chef."
+    assert persona_id in store
+    assert [r["persona_id"] for r in store.list()] == [persona_id]
+
+    store.delete(persona_id)
+    assert make_store(tmp_path).get(persona_id) is None
+
+
+def test_imports_legacy_files(tmp_path):
+    legacy_dir = tmp_path / "legacy"
+    legacy_dir.mkdir()
+    (legacy_dir / f"{VIDEO_ID}_persona.txt").write_text("An old persona.", encoding="utf-8")
+
+    persona_id = artifact_key(VIDEO_ID, MODEL)
+    record = make_store(tmp_path).get_record(persona_id)
+    assert (record["persona"], record["video_id"], record["model"]) == ("An old persona.", VIDEO_ID, MODEL)
+
+    (legacy_dir / f"{VIDEO_ID}_persona.txt").unlink()
+    assert make_store(tmp_path).get(persona_id) == "An old persona."
+    assert make_store(tmp_path).get(artifact_key(VIDEO_ID, "gpt-4o")) is None
+
+
+def test_misses_are_cached_until_written(tmp_path):
+    persona_id = artifact_key(VIDEO_ID, MODEL)
+    store = make_store(tmp_path)
+    assert store.get(persona_id) is None
+    assert store.get(persona_id) is None
+    assert store.missing.hits == 1
+
+    store.put(persona_id, "A fiery chef.")
+    assert store.get(persona_id) == "A fiery chef."
+
+
+def test_cached_misses_see_other_writers(tmp_path):
+    persona_id = artifact_key(VIDEO_ID, MODEL)
+    store = make_store(tmp_path)
+    assert store.get(persona_id) is None
+
+    make_store(tmp_path).put(persona_id, "Written by another process.")
+    assert store.get(persona_id) == "Written by another process."
@@ -0,0 +1,105 @@
+"""
+FoodBuddyRecommender against the path it replaced: the ML Food Buddy
+recommend() followed by drop_duplicates on Name (the original
+get_food_buddy_recommendations).
+"""
+import os
+from pathlib import Path
+import numpy as np
+import pytest
+from food_buddy_api import RETURN_COLUMNS, FoodBuddyRecommender, _clean_results, ml_buddy_import_context
+from recipe_store import convert
+from synthetic_data import generate_recipes
+
+QUERIES = ["chicken garlic onion", "tomato basil parmesan pasta", "salmon lemon", "tofu soy ginger rice", "cinnamon"]
+
+# recommend() as the ML Food Buddy project implements it: cosine similarity, best first
+REFERENCE_RECOMMENDER = '''
+from sklearn.metrics.pairwise import cosine_similarity
+
+
+def recommend(user_prefs, dataset, recipe_vectors_matrix, vectorizer, top_n=3, time_pref=None, calorie_pref=None,
+              return_columns=None):
+    scores = cosine_similarity(vectorizer.transform([user_prefs]), recipe_vectors_matrix).ravel()
+    results = dataset.assign(similarity=scores).sort_values("similarity", ascending=False, kind="stable")
+    return results.head(top_n * 10)[return_columns]
+'''
+
+
+class OldRecommender:
+    """The original module-level load + recommend, run from the ML Food Buddy directory."""
+
+    def __init__(self, root: Path):
+        import joblib
+        import pandas as pd
+
+        self.root = root
+        with ml_buddy_import_context(root) as recommender:
+            self.recommend_fn = recommender.recommend
+            self.vectorizer = joblib.load(root / "models" / "tfidf_vectorizer.pkl")
+        self.df = pd.read_csv(root / "data" / "preprocessed" / "final_recipes.csv.gzip", compression="gzip")
+        self.vectors = np.load(root / "models" / "recipe_vectors.npy")
+
+    def recommend(self, query: str, top_n: int) -> list:
+        cwd = os.getcwd()
+        os.chdir(self.root)
+        try:
+            results = self.recommend_fn(
+                user_prefs=query,
+                dataset=self.df,
+                recipe_vectors_matrix=self.vectors,
+                vectorizer=self.vectorizer,
+                top_n=top_n,
+                time_pref=None,
+                calorie_pref=None,
+                return_columns=RETURN_COLUMNS,
+            )
+        finally:
+            os.chdir(cwd)
+        return _clean_results(results.drop_duplicates(subset=["Name"]).head(top_n))
+
+
+def assert_same_results(new, old):
+    assert len(new) == len(old)
+    new_scores = np.array([r["similarity"] for r in new])
+    np.testing.assert_allclose(new_scores, [r["similarity"] for r in old], rtol=1e-5, atol=1e-6)
+    # Equal scores may come back in either order (and the last tie group may be cut differently)
+    for i, score in enumerate(new_scores):
+        if np.sum(np.isclose(new_scores, score, rtol=1e-5, atol=1e-6)) == 1 and i < len(new) - 1:
+            assert new[i]["Name"] == old[i]["Name"]
+            assert new[i]["ingredients_clean"] == old[i]["ingredients_clean"]
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=["csv", "store"])
+def ml_buddy_root(request, tmp_path_factory):
+    """Synthetic ML Food Buddy directory, with or without a RecipeStore."""
+    root = generate_recipes(tmp_path_factory.mktemp("ml-food-buddy"), rows=3000, max_features=64)
+    (root / "src" / "recommender.py").write_text(REFERENCE_RECOMMENDER, encoding="utf-8")
+    if request.param:
+        convert(root / "data" / "preprocessed" / "final_recipes.csv.gzip", root / "models" / "recipe_store")
+    return root
+
+
+@pytest.mark.parametrize("top_n", [1, 3, 10])
+def test_recommend_matches_old_path(ml_buddy_root, tmp_path, top_n):
+    recommender = FoodBuddyRecommender(ml_buddy_root, delta_path=tmp_path / "delta.jsonl")
+    old = OldRecommender(ml_buddy_root)
+    for query in QUERIES:
+        assert_same_results(recommender.recommend(query, top_n=top_n), old.recommend(query, top_n))
+
+
+def test_recommend_batch_matches_single_queries(ml_buddy_root, tmp_path):
+    recommender = FoodBuddyRecommender(ml_buddy_root, delta_path=tmp_path / "delta.jsonl")
+    old = OldRecommender(ml_buddy_root)
+    for query, results in zip(QUERIES, recommender.recommend_batch(QUERIES, top_n=5)):
+        assert_same_results(results, old.recommend(query, 5))
+
+
+@pytest.mark.skipif(not os.getenv("ML_BUDDY_PATH") or not Path(os.getenv("ML_BUDDY_PATH", "")).is_dir(),
+                    reason="set ML_BUDDY_PATH to an ML Food Buddy checkout to compare against its recommend()")
+def test_recommend_matches_ml_buddy_project(tmp_path):
+    root = Path(os.environ["ML_BUDDY_PATH"]).resolve()
+    recommender = FoodBuddyRecommender(root, delta_path=tmp_path / "delta.jsonl")
+    old = OldRecommender(root)
+    for query in QUERIES:
+        assert_same_results(recommender.recommend(query, top_n=3), old.recommend(query, 3))
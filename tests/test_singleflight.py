@@ -0,0 +1,92 @@
+"""SingleFlight coalescing and FileLock release, sync and async."""
+import asyncio
+import os
+import threading
+import time
+import pytest
+from singleflight import FileLock, SingleFlight
+
+
+def test_concurrent_calls_share_one_run():
+    flights = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def produce():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return "persona"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flights.do("key", produce)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flights.do("key", produce))) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ["persona"] * 5
+    assert flights.do("key", produce) == "persona"
+    assert calls == [1, 1]  # A finished flight is not cached
+
+
+def test_followers_get_the_leaders_exception():
+    flights = SingleFlight()
+
+    async def produce():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("transcript unavailable")
+
+    async def main():
+        return await asyncio.gather(*(flights.do_async("key", produce) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(main())
+    assert [str(e) for e in errors] == ["transcript unavailable"] * 3
+
+
+def test_file_lock_is_released_on_error(tmp_path):
+    lock_path = tmp_path / "locks" / "video.lock"
+    with pytest.raises(RuntimeError):
+        with FileLock(lock_path):
+            raise RuntimeError("boom")
+
+    other = FileLock(lock_path)
+    acquired = threading.Thread(target=other.acquire)
+    acquired.start()
+    acquired.join(timeout=1)
+    assert not acquired.is_alive()
+    other.release()
+
+
+def test_cancelled_async_waiter_releases_the_lock(tmp_path):
+    fcntl = pytest.importorskip("fcntl")
+    lock_path = tmp_path / "video.lock"
+    holder = FileLock(lock_path)
+    holder.acquire()
+
+    async def main():
+        waiter = FileLock(lock_path)
+
+        async def wait_for_lock():
+            async with waiter:
+                pass
+
+        task = asyncio.create_task(wait_for_lock())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        holder.release()  # The waiter's thread now gets the lock and must hand it back
+        await asyncio.sleep(0.2)
+
+    asyncio.run(main())
+    fd = os.open(lock_path, os.O_RDWR)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)  # BlockingIOError while still held
+    finally:
+        os.close(fd)